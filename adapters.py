@@ -0,0 +1,82 @@
+# ------------------------ محولات منخفضة الرتبة (LoRA) ------------------------
+from torch import nn
+from typing import Dict, Iterable, List
+import math
+import torch
+
+
+
+class LoRAAdapter(nn.Module):
+    """
+    فرق منخفض الرتبة يُضاف لمخرج طبقة مجمدة: B @ A مضروباً في alpha / rank.
+    B يبدأ أصفاراً فلا يتغير سلوك النموذج قبل التدريب.
+    """
+
+    def __init__(self, in_features: int, out_features: int, rank: int = 8,
+                 alpha: float = 16.0, dropout: float = 0.05, device=None, dtype=None):
+        super().__init__()
+        self.lora_A = nn.Parameter(torch.empty(rank, in_features, device=device, dtype=dtype))
+        self.lora_B = nn.Parameter(torch.zeros(out_features, rank, device=device, dtype=dtype))
+        nn.init.kaiming_uniform_(self.lora_A, a=math.sqrt(5))
+        self.scaling = alpha / rank
+        self.dropout = nn.Dropout(dropout)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return (self.dropout(x) @ self.lora_A.t() @ self.lora_B.t()) * self.scaling
+
+
+def _layer_features(module: nn.Module):
+    """(المدخلات، المخرجات) لطبقة Conv1D الخاصة ب GPT-2 أو nn.Linear"""
+    if isinstance(module, nn.Linear):
+        return module.in_features, module.out_features
+    # Conv1D يخزن الوزن بالشكل (in, out)
+    return module.weight.shape[0], module.weight.shape[1]
+
+
+def inject_lora(model: nn.Module, target_modules: Iterable[str] = ("c_attn",),
+                rank: int = 8, alpha: float = 16.0, dropout: float = 0.05) -> Dict:
+    """
+    إضافة محولات LoRA للطبقات المستهدفة عبر forward hook وتجميد كل الأوزان الأخرى.
+    أوزان الطبقات الأصلية لا تتغير، لكن state_dict يكسب مفاتيح
+    *.lora_adapter.lora_A/lora_B لكل طبقة (adapter_state_dict يعيدها وحدها).
+
+    Returns:
+        dict: إعدادات المحولات وأسماء الطبقات التي أُضيفت لها.
+    """
+    targets = tuple(target_modules)
+    layers: List[str] = []
+    for name, module in list(model.named_modules()):
+        if name.split(".")[-1] not in targets or hasattr(module, "lora_adapter"):
+            continue
+        in_features, out_features = _layer_features(module)
+        module.lora_adapter = LoRAAdapter(
+            in_features, out_features, rank, alpha, dropout,
+            device=module.weight.device, dtype=module.weight.dtype
+        )
+        module.register_forward_hook(lambda layer, inputs, output: output + layer.lora_adapter(inputs[0]))
+        layers.append(name)
+
+    # النموذج الأساسي مجمد: لا تدرجات ولا حالة مُحسِّن له
+    for param_name, param in model.named_parameters():
+        param.requires_grad = ".lora_adapter." in param_name
+
+    return {
+        "target_modules": list(targets),
+        "rank": rank,
+        "alpha": alpha,
+        "dropout": dropout,
+        "layers": layers
+    }
+
+
+def adapter_parameters(model: nn.Module) -> List[nn.Parameter]:
+    """أوزان المحولات فقط (لبناء المُحسِّن)"""
+    return [p for name, p in model.named_parameters() if ".lora_adapter." in name]
+
+
+def adapter_state_dict(model: nn.Module) -> Dict[str, torch.Tensor]:
+    return {
+        name: tensor.detach().cpu()
+        for name, tensor in model.state_dict().items()
+        if ".lora_adapter." in name
+    }
@@ -1,67 +1,349 @@
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
-import torch
-import re
-
-class AraGPT2Assistant:
-    def __init__(self, model_name="aubmindlab/aragpt2-base"):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = GPT2Tokenizer.from_pretrained(model_name)
-        self.model = GPT2LMHeadModel.from_pretrained(model_name).to(self.device)
-        self.model.eval()
-        
-        self.stop_phrases = [
-            "اتصلوا بنا", "صادم:", "الربح من الإنترنت", 
-            "فيسبوك", "واتساب", "البريد الإلكتروني"
-        ]
-
-    def generate_response(self, prompt, max_length=150, temperature=0.7):
-        try:
-            # تنظيف المدخلات
-            clean_prompt = self.clean_input(prompt)
-            
-            inputs = self.tokenizer.encode(
-                clean_prompt, 
-                return_tensors="pt",
-                max_length=512,
-                truncation=True
-            ).to(self.device)
-
-            outputs = self.model.generate(
-                inputs,
-                max_length=max_length,
-                temperature=temperature,
-                top_k=50,
-                top_p=0.95,
-                repetition_penalty=1.5,
-                num_return_sequences=1,
-                pad_token_id=self.tokenizer.eos_token_id
-            )
-            
-            raw_response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return self.clean_output(raw_response, clean_prompt)
-            
-        except Exception as e:
-            return f"Error: {str(e)}"
-
-    def clean_input(self, text):
-        # إزالة الروابط والأرقام
-        text = re.sub(r'http\S+', '', text)
-        text = re.sub(r'\d+', '', text)
-        return text.strip()[:500]  # تقييد طول المدخلات
-
-    def clean_output(self, text, prompt):
-        # إزالة النص المكرر
-        text = text.replace(prompt, "").strip()
-        
-        # إزالة الجمل غير المرغوبة
-        for phrase in self.stop_phrases:
-            text = text.split(phrase)[0]
-        
-        # تقصير الجمل الطويلة
-        sentences = [s.strip() for s in text.split(".") if s.strip()]
-        if len(sentences) > 3:
-            text = ". ".join(sentences[:3]) + "."
-            
-        # إزالة التكرارات
-        text = re.sub(r'(\?|\.|!)\1+', r'\1', text)
+from model_registry import registry
+from kv_cache import PrefixKVCache
+from generation_backends import select_backend
+from checkpoint_manager import watch_checkpoints
+from stopping_criteria import ResponseStopper, TextStoppingCriteria
+from transformers import (LogitsProcessorList, RepetitionPenaltyLogitsProcessor, StoppingCriteriaList,
+                          TemperatureLogitsWarper, TopKLogitsWarper, TopPLogitsWarper)
+from collections import Counter
+import threading
+import time
+import torch
+import re
+
+class AraGPT2Assistant:
+    def __init__(self, model_name="aubmindlab/aragpt2-base", dtype="float32", device=None,
+                 owner="AraGPT2Assistant", quantize=False, backend="auto", lazy=False):
+        # وضع int8 الديناميكي للأجهزة بدون GPU (النسخة المكممة محفوظة على القرص)
+        if quantize:
+            dtype, device = "qint8", "cpu"
+        self._load_args = {"model_name": model_name, "dtype": dtype, "device": device, "owner": owner}
+        self._backend_name = backend
+        self._load_lock = threading.Lock()
+        self.handle = None
+
+        # ذاكرة KV لبادئة المحادثة (نافذة 512 token كما في clean_input/encode)
+        self.kv_cache = PrefixKVCache(max_tokens=512)
+        
+        self.stop_phrases = [
+            "اتصلوا بنا", "صادم:", "الربح من الإنترنت", 
+            "فيسبوك", "واتساب", "البريد الإلكتروني"
+        ]
+        # يوقف التوليد بمجرد أن تصبح ال tokens التالية محذوفة في clean_output
+        self.stopper = ResponseStopper(self.stop_phrases, max_sentences=3, max_chars=500)
+        self.generation_stats = {
+            "requests": 0,
+            "tokens_generated": 0,
+            "tokens_saved": 0,
+            "stop_reasons": Counter()
+        }
+        self.last_generation = None
+        self._stats_lock = threading.Lock()
+
+        # مع lazy=True يؤجل التحميل حتى أول استخدام أو حتى استدعاء load في الخلفية
+        if not lazy:
+            self.load()
+
+    def load(self):
+        """تحميل النموذج المشترك وتجهيز واجهة التوليد (مرة واحدة فقط)"""
+        with self._load_lock:
+            if self.handle is not None:
+                return
+            # النموذج مشترك عبر السجل بدلاً من تحميل نسخة جديدة لكل مستخدم
+            handle = registry.acquire(**self._load_args)
+            self.device = handle.device
+            self.tokenizer = handle.tokenizer
+            self.model = handle.model
+            self._separator_ids = self.tokenizer.encode("\n")
+
+            # واجهة التوليد (torch أو onnx)؛ auto يختار الأسرع بقياس سريع عند أول تحميل
+            select_backend(handle, self._backend_name)
+
+            # نقاط التحقق الجديدة تُبدل داخل النموذج المشترك بين الطلبات بدون إعادة تشغيل
+            watch_checkpoints(handle)
+            self.handle = handle
+
+    @property
+    def is_loaded(self):
+        return self.handle is not None
+
+    @property
+    def backend(self):
+        """واجهة التوليد الحالية (تتبع تغير الأوزان بعد التدريب أو تبديل نقطة تحقق)"""
+        return select_backend(self.handle, self._backend_name)
+
+    def generate_response(self, prompt, max_length=150, temperature=0.7,
+                          max_new_tokens=None, do_sample=None, deadline=None, outcome=None):
+        try:
+            # نفس حلقة فك الترميز المستخدمة في البث، فوق واجهة التوليد المختارة
+            raw_response = "".join(self.stream_response(
+                prompt,
+                max_length=max_length,
+                temperature=temperature,
+                max_new_tokens=max_new_tokens,
+                do_sample=do_sample,
+                deadline=deadline,
+                outcome=outcome
+            ))
+            return self.clean_output(raw_response, self.clean_input(prompt))
+            
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def generate_batch(self, prompts, max_length=150, temperature=0.7, deadline=None, outcomes=None,
+                       contexts=None, deadlines=None, on_chunks=None):
+        """
+        توليد ردود لعدة رسائل في تمريرة generate واحدة بدفعة مبطّنة من اليسار.
+        
+        Args:
+            deadline (float): وقت time.monotonic() الذي يتوقف عنده التوليد للدفعة كلها.
+            outcomes (list): قواميس تُملأ بسبب التوقف وعدد ال tokens لكل رسالة.
+            contexts (list): المساعد صاحب المحادثة لكل رسالة؛ تُسبق الرسالة بأدوار
+                محادثته (بدون إعادة استخدام ذاكرة KV داخل الدفعة).
+            deadlines (list): مهلة كل رسالة؛ الصف الذي تنتهي مهلته يُقص ويعود جزئياً
+                وتكمل بقية الدفعة.
+            on_chunks (list): دالة بث لكل رسالة (أو None) تستقبل أجزاء ردها أثناء التوليد.
+        """
+        self.load()
+        outcomes = outcomes if outcomes is not None else [{} for _ in prompts]
+        contexts = contexts or [None] * len(prompts)
+        on_chunks = on_chunks or [None] * len(prompts)
+        # مهلة الصف هي الأقرب من مهلته ومهلة الدفعة
+        deadlines = [
+            min((d for d in (deadline, row_deadline) if d is not None), default=None)
+            for row_deadline in (deadlines or [None] * len(prompts))
+        ]
+        if not self.backend.supports_batch:
+            return [
+                self._generate_row(p, max_length, temperature, d, o, c, f)
+                for p, d, o, c, f in zip(prompts, deadlines, outcomes, contexts, on_chunks)
+            ]
+
+        messages = [
+            self.tokenizer.encode(self.clean_input(p), max_length=512, truncation=True)
+            for p in prompts
+        ]
+        encoded = [
+            ids if context is None else context.kv_cache.build_prompt(ids, self._separator_ids)
+            for ids, context in zip(messages, contexts)
+        ]
+        longest = max(len(ids) for ids in encoded)
+        pad_id = self.tokenizer.eos_token_id
+
+        # GPT-2 يكمل من آخر token لذلك يكون التبطين على اليسار
+        input_ids = torch.tensor(
+            [[pad_id] * (longest - len(ids)) + ids for ids in encoded], device=self.device
+        )
+        attention_mask = torch.tensor(
+            [[0] * (longest - len(ids)) + [1] * len(ids) for ids in encoded], device=self.device
+        )
+        # ميزانية كل صف من طول رسالته كما في stream_response، والدفعة تعمل حتى أكبرها
+        budgets = [
+            min(max(max_length - len(ids), 1), self.model.config.n_positions - longest)
+            for ids in messages
+        ]
+        max_new_tokens = max(budgets)
+        criteria = TextStoppingCriteria(self.stopper, self.tokenizer, longest, budgets=budgets,
+                                        deadlines=deadlines, on_chunks=on_chunks)
+
+        with self.handle.lock, torch.no_grad():
+            outputs = self.model.generate(
+                input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=max_new_tokens,
+                stopping_criteria=StoppingCriteriaList([criteria]),
+                temperature=temperature,
+                top_k=50,
+                top_p=0.95,
+                repetition_penalty=1.5,
+                num_return_sequences=1,
+                pad_token_id=pad_id
+            )
+
+        steps = outputs.shape[1] - longest
+        responses = []
+        for i, (row, budget, outcome) in enumerate(zip(outputs, budgets, outcomes)):
+            # ال tokens بعد ميزانية الصف أو مهلته أو توقفه تُهمل كأن الصف توقف عندها
+            row_steps = min(steps, budget, criteria.limits.get(i, steps))
+            if i in criteria.deadline_rows:
+                reason = "deadline"
+            else:
+                reason = "length" if row_steps >= budget else "criteria"
+            self._record_generation(row_steps, budget, reason)
+            outcome.update(reason=reason, tokens=row_steps)
+            text = self.tokenizer.decode(row[longest:longest + row_steps], skip_special_tokens=True)
+            stop = self.stopper.check(text)
+            if stop is not None:
+                text = text[:stop[0]]
+            if on_chunks[i] is not None:
+                criteria.emit(i, text)
+            responses.append(self.clean_output(text, ""))
+        return responses
+
+    def _generate_row(self, prompt, max_length, temperature, deadline, outcome, context, on_chunk):
+        """رد رسالة واحدة من الدفعة عندما لا تدعم واجهة التوليد الدفعات"""
+        if context is None and on_chunk is None:
+            return self.generate_response(prompt, max_length=max_length, temperature=temperature,
+                                          deadline=deadline, outcome=outcome)
+        chunks = []
+        for chunk in (context or self).stream_response(
+            prompt, max_length=max_length, temperature=temperature, use_context=context is not None,
+            deadline=deadline, outcome=outcome
+        ):
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+        return self.clean_output("".join(chunks), "")
+
+    def stream_response(self, prompt, max_length=150, temperature=0.7, use_context=False,
+                        max_new_tokens=None, do_sample=None, deadline=None, outcome=None):
+        """
+        توليد الرد على شكل أجزاء نصية متتالية بمجرد توليد كل token.
+        
+        Args:
+            use_context (bool): بناء الرد على أدوار المحادثة السابقة مع إعادة
+                استخدام past_key_values للبادئة المعالجة مسبقاً.
+            max_new_tokens (int): عدد ال tokens الجديدة (بدلاً من حسابه من max_length).
+            do_sample (bool): أخذ العينات بدلاً من التوليد الجشع (الافتراضي حسب إعدادات النموذج).
+            deadline (float): وقت time.monotonic() الذي يتوقف عنده التوليد ويبقى الرد جزئياً.
+            outcome (dict): يُملأ بسبب التوقف ("deadline"، "eos"، ...) وعدد ال tokens.
+        
+        Yields:
+            str: الجزء الجديد من النص منذ آخر جزء تم إرساله.
+        """
+        self.load()
+        clean_prompt = self.clean_input(prompt)
+        message_ids = self.tokenizer.encode(clean_prompt, max_length=512, truncation=True)
+
+        weights_version = self.handle.weights_version
+        if use_context:
+            prompt_ids = self.kv_cache.build_prompt(message_ids, self._separator_ids)
+            reused, past = self.kv_cache.reuse(prompt_ids, weights_version)
+        else:
+            prompt_ids, reused, past = message_ids, 0, None
+
+        input_ids = torch.tensor([prompt_ids], device=self.device)
+        prompt_length = input_ids.shape[1]
+        # ميزانية ال tokens الجديدة تحسب من طول الرسالة فقط (max_length يشمل المطالبة)
+        if max_new_tokens is None:
+            max_new_tokens = max(max_length - len(message_ids), 1)
+        max_new_tokens = min(max_new_tokens, self.model.config.n_positions - prompt_length)
+
+        if do_sample is None:
+            do_sample = bool(getattr(self.model.generation_config, "do_sample", False))
+        processors = self._logits_processors(temperature, do_sample)
+
+        backend = self.backend
+        generated = input_ids
+        next_input = input_ids[:, reused:]
+        emitted = ""
+        steps = 0
+        reason = "length"
+
+        with self.handle.lock, torch.no_grad():
+            try:
+                for _ in range(max_new_tokens):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        reason = "deadline"
+                        break
+                    steps += 1
+                    logits, past = backend.forward(next_input, past)
+                    scores = processors(generated, logits.to(generated.device))
+
+                    if do_sample:
+                        next_token = torch.multinomial(torch.softmax(scores, dim=-1), num_samples=1)
+                    else:
+                        next_token = torch.argmax(scores, dim=-1, keepdim=True)
+
+                    if next_token.item() == self.tokenizer.eos_token_id:
+                        reason = "eos"
+                        break
+
+                    generated = torch.cat([generated, next_token], dim=-1)
+                    next_input = next_token
+
+                    text = self.tokenizer.decode(generated[0, prompt_length:], skip_special_tokens=True)
+                    if text.endswith("\ufffd"):
+                        continue  # حرف عربي غير مكتمل بين tokenين
+
+                    # التوقف فور أن يصبح الباقي محذوفاً في clean_output على أي حال
+                    stop = self.stopper.check(text)
+                    if stop is not None:
+                        text = text[:stop[0]]
+
+                    if len(text) > len(emitted):
+                        yield text[len(emitted):]
+                        emitted = text
+
+                    if stop is not None:
+                        reason = stop[1]
+                        break
+            finally:
+                self._record_generation(steps, max_new_tokens, reason)
+                if outcome is not None:
+                    outcome.update(reason=reason, tokens=steps)
+                if use_context:
+                    # نحتفظ بذاكرة البادئة فقط (بدون ال tokens المولدة) للدور التالي
+                    self.kv_cache.store(prompt_ids, past, weights_version)
+
+    def _record_generation(self, steps, budget, reason):
+        """تسجيل عدد ال tokens المولدة والموفرة بالتوقف المبكر"""
+        saved = budget - steps if reason not in ("length", "eos", "deadline") else 0
+        with self._stats_lock:
+            self.generation_stats["requests"] += 1
+            self.generation_stats["tokens_generated"] += steps
+            self.generation_stats["tokens_saved"] += saved
+            self.generation_stats["stop_reasons"][reason] += 1
+            self.last_generation = {"tokens": steps, "budget": budget, "tokens_saved": saved, "reason": reason}
+
+    def commit_turn(self, message, response):
+        """
+        تسجيل دور مكتمل حتى يصبح جزءاً من بادئة المحادثة في الدور التالي
+        (لا شيء قبل تحميل النموذج: لا يُحمّل لأجل دور واحد)
+        """
+        if self.handle is None:
+            return
+        message_ids = self.tokenizer.encode(self.clean_input(message), max_length=512, truncation=True)
+        response_ids = self.tokenizer.encode(response)
+        self.kv_cache.add_turn(message_ids, response_ids)
+
+    def reset_conversation(self):
+        """بدء محادثة جديدة ومسح ذاكرة KV"""
+        self.kv_cache.reset()
+
+    def _logits_processors(self, temperature, do_sample):
+        """بناء معالجات ال logits المطابقة لإعدادات التوليد"""
+        processors = LogitsProcessorList([RepetitionPenaltyLogitsProcessor(penalty=1.5)])
+        if do_sample:
+            processors.append(TemperatureLogitsWarper(temperature))
+            processors.append(TopKLogitsWarper(top_k=50))
+            processors.append(TopPLogitsWarper(top_p=0.95))
+        return processors
+
+    def release(self):
+        """تحرير مقبض النموذج المشترك"""
+        if self.handle is not None:
+            self.handle.release()
+
+    def clean_input(self, text):
+        # إزالة الروابط والأرقام
+        text = re.sub(r'http\S+', '', text)
+        text = re.sub(r'\d+', '', text)
+        return text.strip()[:500]  # تقييد طول المدخلات
+
+    def clean_output(self, text, prompt):
+        # إزالة النص المكرر
+        text = text.replace(prompt, "").strip()
+        
+        # إزالة الجمل غير المرغوبة
+        for phrase in self.stop_phrases:
+            text = text.split(phrase)[0]
+        
+        # تقصير الجمل الطويلة
+        sentences = [s.strip() for s in text.split(".") if s.strip()]
+        if len(sentences) > 3:
+            text = ". ".join(sentences[:3]) + "."
+            
+        # إزالة التكرارات
+        text = re.sub(r'(\?|\.|!)\1+', r'\1', text)
         return text[:500]  # تقييد طول المخرجات
\ No newline at end of file
@@ -0,0 +1,59 @@
+# ------------------------ توحيد النص العربي قبل المطابقة ------------------------
+from functools import lru_cache
+from typing import List
+import json
+import re
+import sqlite3
+
+
+# التشكيل وعلامة المد الخنجرية والتطويل
+_DIACRITICS = re.compile(r'[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+_PUNCTUATION = re.compile(r'[^\w\s]|_')
+_SPACES = re.compile(r'\s+')
+
+_CHAR_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+    # الأرقام العربية الهندية والفارسية إلى أرقام لاتينية
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    **{chr(0x06F0 + i): str(i) for i in range(10)}
+})
+
+
+@lru_cache(maxsize=8192)
+def normalize_arabic(text: str) -> str:
+    """
+    الشكل الموحد للنص: بدون تشكيل أو تطويل أو علامات ترقيم، مع توحيد الهمزات والألف
+    والتاء المربوطة والألف المقصورة والأرقام، وأحرف لاتينية صغيرة ومسافات مفردة
+    """
+    if not text:
+        return ""
+    text = _DIACRITICS.sub("", text).translate(_CHAR_MAP).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def split_keywords(value: str) -> List[str]:
+    """كلمات الكشف المخزنة كقائمة JSON أو كنص مفصول بفواصل"""
+    if not value:
+        return []
+    try:
+        keywords = json.loads(value)
+    except json.JSONDecodeError:
+        keywords = value.replace("،", ",").split(",")
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    return [str(kw).strip() for kw in keywords if str(kw).strip()]
+
+
+def register_sqlite_functions(conn: sqlite3.Connection) -> None:
+    """إتاحة التوحيد داخل SQL (للأعمدة الموحدة و triggers الفهارس)"""
+    conn.create_function("normalize_arabic", 1, normalize_arabic, deterministic=True)
+    conn.create_function(
+        "split_keywords", 1,
+        lambda value: json.dumps(split_keywords(value), ensure_ascii=False),
+        deterministic=True
+    )
@@ -0,0 +1,313 @@
+# ------------------------ الاحتفاظ بالبيانات وأرشفتها في ملفات شهرية ------------------------
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from storage import get_storage
+from urllib.request import pathname2url
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+# الجداول المؤرشفة: الجدول -> عمود الزمن
+ARCHIVE_TABLES = {
+    "interactions": "timestamp",
+    "conversations": "timestamp"
+}
+
+# جداول تابعة تنتقل مع صفوفها الأصلية: الجدول -> [(الجدول التابع، عمود الربط)]
+DEPENDENT_TABLES = {
+    "interactions": [("improvements", "interaction_id")]
+}
+
+# أيام بقاء الصفوف في القاعدة الرئيسية قبل نقلها للأرشيف
+DEFAULT_RETENTION_DAYS = {
+    "interactions": 90,
+    "conversations": 180
+}
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _next_month(month: str) -> str:
+    year, number = (int(part) for part in month.split("-"))
+    return f"{year + number // 12}-{number % 12 + 1:02d}"
+
+
+class ArchiveManager:
+    """
+    طبقات الاحتفاظ: القاعدة الرئيسية للبيانات الحديثة، ثم ملف أرشيف لكل شهر
+    يُربط بـ ATTACH عند الحاجة فقط، ثم الحذف النهائي اختيارياً بعد purge_after_days.
+    النقل بدفعات صغيرة حتى لا يُحجز الكاتب طويلاً.
+    """
+
+    def __init__(self, db_path: str, directory: Optional[str] = None,
+                 retention_days: Optional[Dict[str, int]] = None,
+                 purge_after_days: Optional[int] = None,
+                 batch_size: int = 2000, pause: float = 0.05):
+        self.db_path = db_path
+        self.storage = get_storage(db_path)
+        self.directory = directory or os.path.join(os.path.dirname(os.path.abspath(db_path)), "archive")
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0]
+        self.retention_days = dict(DEFAULT_RETENTION_DAYS, **(retention_days or {}))
+        self.purge_after_days = purge_after_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.stats = {"archived_rows": 0, "purged_files": 0, "vacuumed_pages": 0, "last_run": None}
+        self._vacuum_failed = False  # VACUUM تفعيل auto_vacuum يُحاول مرة واحدة لكل تشغيل
+
+    # ------------------------ ملفات الأرشيف ------------------------
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{month}.db")
+
+    def archived_months(self) -> List[str]:
+        """أشهر ملفات الأرشيف الموجودة من الأقدم للأحدث"""
+        if not os.path.isdir(self.directory):
+            return []
+        pattern = re.compile(rf"^{re.escape(self.prefix)}-(\d{{4}}-\d{{2}})\.db$")
+        return sorted(
+            match.group(1)
+            for match in (pattern.match(name) for name in os.listdir(self.directory))
+            if match
+        )
+
+    # ------------------------ الأرشفة ------------------------
+    def run_once(self) -> Dict[str, int]:
+        """تطبيق سياسة الاحتفاظ كاملة: نقل القديم، حذف الأرشيف المنتهي، واسترجاع المساحة"""
+        moved = {table: self.archive_table(table) for table in ARCHIVE_TABLES}
+        self.purge()
+        self.incremental_vacuum()
+        self.stats["last_run"] = datetime.now().strftime(TIME_FORMAT)
+        return moved
+
+    def archive_table(self, table: str) -> int:
+        """نقل صفوف الجدول الأقدم من مدة الاحتفاظ إلى أرشيف شهرها"""
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days[table])).strftime(TIME_FORMAT)
+        column = ARCHIVE_TABLES[table]
+        months = [row[0] for row in self.storage.reader().execute(
+            f"SELECT DISTINCT strftime('%Y-%m', {column}) FROM {table} WHERE {column} < ?", (cutoff,)
+        ).fetchall() if row[0]]
+        moved = 0
+        for month in months:
+            start = f"{month}-01 00:00:00"
+            end = min(f"{_next_month(month)}-01 00:00:00", cutoff)
+            moved += self._archive_range(table, month, start, end)
+        self.stats["archived_rows"] += moved
+        return moved
+
+    def _archive_range(self, table: str, month: str, start: str, end: str) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        column = ARCHIVE_TABLES[table]
+        where = f"{column} >= ? AND {column} < ? AND id <= ?"
+        moved = 0
+        while True:
+            with self.storage.exclusive() as conn:
+                conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path(month),))
+                try:
+                    # المرحلة الأولى: نسخ الدفعة للأرشيف (تُثبت في ملفه أولاً)
+                    with self.storage.write():
+                        last_id = conn.execute(f"""
+                        SELECT MAX(id) FROM (
+                            SELECT id FROM main.{table}
+                            WHERE {column} >= ? AND {column} < ?
+                            ORDER BY id LIMIT ?
+                        )
+                        """, (start, end, self.batch_size)).fetchone()[0]
+                        if last_id is None:
+                            return moved
+                        params = (start, end, last_id)
+                        self._copy(conn, table, f"WHERE {where}", params)
+                        for dependent, key in DEPENDENT_TABLES.get(table, []):
+                            self._copy(conn, dependent, f"WHERE {key} IN (SELECT id FROM main.{table} WHERE {where})", params)
+
+                    # المرحلة الثانية: حذف ما وصل للأرشيف فقط؛ انهيار بين المرحلتين
+                    # يعني نسخاً مكرراً يُتجاهل في التشغيل التالي وليس فقداناً
+                    with self.storage.write():
+                        conn.execute("UPDATE app_meta SET value = 1 WHERE key = 'archiving'")
+                        deleted = conn.execute(f"""
+                        DELETE FROM main.{table}
+                        WHERE {where} AND id IN (SELECT id FROM archive.{table})
+                        """, params).rowcount
+                        conn.execute("UPDATE app_meta SET value = 0 WHERE key = 'archiving'")
+                    moved += deleted
+                finally:
+                    conn.execute("DETACH DATABASE archive")
+            # فرصة لباقي الكتابات بين الدفعات
+            time.sleep(self.pause)
+
+    @staticmethod
+    def _copy(conn: sqlite3.Connection, table: str, where: str, params: Sequence[Any]) -> None:
+        """نسخ الصفوف لجدول الأرشيف بنفس الأعمدة (يُنشأ أو يُكمل عند الحاجة)"""
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})").fetchall()]
+        archived = [row[1] for row in conn.execute(f"PRAGMA archive.table_info({table})").fetchall()]
+        if not archived:
+            sql = conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()[0]
+            # نفس تعريف الجدول؛ القيود الخارجية تشير لجداول الأرشيف نفسه (الأصل يُنسخ قبل التابع)
+            conn.execute(re.sub(r"^CREATE TABLE\s+(IF NOT EXISTS\s+)?", "CREATE TABLE archive.", sql, count=1))
+            time_column = ARCHIVE_TABLES.get(table)
+            if time_column:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_{time_column} ON {table}({time_column})")
+        else:
+            # أعمدة أضافتها ترحيلات لاحقة للجدول الرئيسي
+            for name in columns:
+                if name not in archived:
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name}")
+        cols = ", ".join(columns)
+        conn.execute(f"INSERT OR IGNORE INTO archive.{table} ({cols}) SELECT {cols} FROM main.{table} {where}", params)
+
+    def purge(self) -> int:
+        """حذف ملفات الأرشيف التي تجاوزت purge_after_days (الطبقة الأخيرة)"""
+        if self.purge_after_days is None:
+            return 0
+        limit = (datetime.utcnow() - timedelta(days=self.purge_after_days)).strftime("%Y-%m")
+        purged = 0
+        for month in self.archived_months():
+            # الشهر كله أقدم من الحد
+            if _next_month(month) <= limit:
+                try:
+                    os.remove(self.archive_path(month))
+                    purged += 1
+                except OSError as e:
+                    print(f"❌ تعذر حذف أرشيف {month}: {str(e)}")
+        self.stats["purged_files"] += purged
+        return purged
+
+    # ------------------------ استرجاع المساحة ------------------------
+    def incremental_vacuum(self, pages: int = 256) -> int:
+        """
+        إعادة الصفحات الفارغة لنظام الملفات على خطوات قصيرة بدل VACUUM كامل يحجز
+        القاعدة. الملفات القديمة تحتاج VACUUM واحداً لتفعيل auto_vacuum التدريجي.
+        """
+        with self.storage.exclusive() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                if self._vacuum_failed:
+                    # لا نعيد VACUUM كاملاً فشل سابقاً في كل دورة
+                    return 0
+                print("✅ تفعيل الاسترجاع التدريجي للمساحة (VACUUM لمرة واحدة)")
+                try:
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    conn.execute("VACUUM")
+                except sqlite3.OperationalError as e:
+                    self._vacuum_failed = True
+                    print(f"❌ تعذر تفعيل الاسترجاع التدريجي للمساحة: {str(e)}")
+                return 0
+        freed = 0
+        while True:
+            with self.storage.write() as conn:
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free:
+                    break
+                conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            freed += free - remaining
+            if remaining >= free:
+                break
+            time.sleep(self.pause)
+        self.stats["vacuumed_pages"] += freed
+        return freed
+
+    # ------------------------ القراءة الموحدة ------------------------
+    def _parts(self, table: str, start: Optional[str], end: Optional[str]) -> List[Optional[str]]:
+        """ملفات الأرشيف المتقاطعة مع المدى (الأقدم أولاً) ثم القاعدة الرئيسية (None)"""
+        parts: List[Optional[str]] = []
+        for month in self.archived_months():
+            month_start, month_end = f"{month}-01 00:00:00", f"{_next_month(month)}-01 00:00:00"
+            if (end is None or month_start < end) and (start is None or month_end > start):
+                parts.append(month)
+        parts.append(None)
+        return parts
+
+    @staticmethod
+    def _read_only_uri(path: str) -> str:
+        return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+    def query(self, table: str, select: str = "*", where: str = "1", params: Sequence[Any] = (),
+              start: Optional[str] = None, end: Optional[str] = None,
+              ordered: bool = True) -> Iterator[Tuple]:
+        """
+        صفوف الجدول عبر الأرشيف والقاعدة الرئيسية معاً، مرتبة زمنياً، ضمن [start, end).
+        كل ملف أرشيف يُربط بـ ATTACH على اتصال قراءة خاص ثم يُفصل بعد قراءته.
+        """
+        column = ARCHIVE_TABLES[table]
+        conditions, bounds = [f"({where})"], list(params)
+        if start is not None:
+            conditions.append(f"{column} >= ?")
+            bounds.append(start)
+        if end is not None:
+            conditions.append(f"{column} < ?")
+            bounds.append(end)
+        condition = " AND ".join(conditions)
+        order = f" ORDER BY {column}, id" if ordered else ""
+
+        # اتصال قراءة فقط حتى لا تمس القراءات التحليلية ملفات الأرشيف
+        conn = sqlite3.connect(self._read_only_uri(self.db_path), uri=True)
+        try:
+            for month in self._parts(table, start, end):
+                schema = "main"
+                if month is not None:
+                    conn.execute("ATTACH DATABASE ? AS archive", (self._read_only_uri(self.archive_path(month)),))
+                    schema = "archive"
+                try:
+                    exists = conn.execute(
+                        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                    ).fetchone()
+                    if exists:
+                        yield from conn.execute(
+                            f"SELECT {select} FROM {schema}.{table} WHERE {condition}{order}",
+                            bounds
+                        )
+                finally:
+                    if month is not None:
+                        conn.execute("DETACH DATABASE archive")
+        finally:
+            conn.close()
+
+    def count(self, table: str, where: str = "1", params: Sequence[Any] = (),
+              start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """عدد الصفوف عبر الأرشيف والقاعدة الرئيسية"""
+        return sum(row[0] for row in self.query(table, "COUNT(*)", where, params, start, end, ordered=False))
+
+
+class RetentionScheduler(threading.Thread):
+    """تشغيل سياسة الاحتفاظ دورياً في الخلفية"""
+
+    def __init__(self, manager: ArchiveManager, interval: float = 24 * 3600, initial_delay: float = 300):
+        super().__init__(name="RetentionScheduler", daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        delay = self.initial_delay
+        while not self._stop_event.wait(delay):
+            try:
+                moved = self.manager.run_once()
+                if any(moved.values()):
+                    print(f"✅ أرشفة البيانات القديمة: {moved}")
+            except Exception as e:
+                print(f"❌ خطأ في أرشفة البيانات: {str(e)}")
+            delay = self.interval
+
+
+_managers: Dict[str, ArchiveManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_archive_manager(db_path: str, start_scheduler: bool = True) -> ArchiveManager:
+    """مدير أرشيف واحد لكل ملف قاعدة بيانات، مع جدولة التشغيل الدوري عند أول طلب"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ArchiveManager(db_path)
+            if start_scheduler:
+                RetentionScheduler(manager).start()
+            _managers[key] = manager
+        return manager
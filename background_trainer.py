@@ -0,0 +1,157 @@
+# ------------------------ التدريب في الخلفية بدفعات صغيرة ------------------------
+from inference_worker import inference_idle_seconds
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import random
+import threading
+import time
+import torch
+
+
+class BackgroundTrainer(threading.Thread):
+    """
+    خيط تدريب يجمع التفاعلات التي تحتاج تحسيناً في ذاكرة إعادة (replay buffer)
+    ويدرب عليها بدفعات صغيرة مع تجميع التدرجات، فقط عندما يكون التطبيق خاملاً
+    """
+
+    def __init__(self, model_handle, tokenizer, optimizer,
+                 on_step: Optional[Callable[[float], None]] = None,
+                 buffer_size: int = 512, batch_size: int = 4, accumulation_steps: int = 4,
+                 idle_seconds: float = 20.0, poll_interval: float = 2.0, max_length: int = 128,
+                 idle_check: Callable[[], float] = inference_idle_seconds):
+        super().__init__(name="BackgroundTrainer", daemon=True)
+        self.model_handle = model_handle
+        self.tokenizer = tokenizer
+        self.optimizer = optimizer
+        self.on_step = on_step  # يُستدعى بمتوسط الخسارة بعد كل خطوة مُحسِّن
+        self.batch_size = batch_size
+        self.accumulation_steps = accumulation_steps
+        self.idle_seconds = idle_seconds
+        self.poll_interval = poll_interval
+        self.max_length = max_length
+        self.idle_check = idle_check
+
+        self._buffer: Deque[Tuple[str, str]] = deque(maxlen=buffer_size)
+        self._fresh = 0  # أمثلة جديدة لم يُدرب عليها بعد
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "steps": 0,
+            "examples_trained": 0,
+            "rounds_aborted": 0,
+            "training_seconds": 0.0,
+            "last_loss": None
+        }
+
+    def enqueue(self, user_input: str, ai_response: str) -> None:
+        """إضافة تفاعل للتدريب لاحقاً (لا يحجز الخيط المستدعي)"""
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._stats["dropped"] += 1
+            self._buffer.append((user_input, ai_response))
+            self._fresh = min(self._fresh + 1, len(self._buffer))
+            self._stats["enqueued"] += 1
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """إيقاف التدريب بعد إنهاء الدفعة الصغيرة الحالية"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _is_idle(self) -> bool:
+        return self.idle_check() >= self.idle_seconds
+
+    def run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            with self._lock:
+                ready = self._fresh >= self.batch_size
+            if ready and self._is_idle():
+                try:
+                    self._train_round()
+                except Exception as e:
+                    print(f"❌ خطأ في التدريب الخلفي: {str(e)}")
+
+    def _draw_examples(self) -> Tuple[List[Tuple[str, str]], int]:
+        """الأمثلة الجديدة أولاً ثم عينات عشوائية من الأقدم لإكمال الدفعات"""
+        with self._lock:
+            total = self.batch_size * self.accumulation_steps
+            examples = list(self._buffer)
+            fresh_count = min(self._fresh, total)
+            fresh = examples[len(examples) - self._fresh:][:fresh_count]
+            older = examples[:len(examples) - self._fresh]
+        replay = random.sample(older, min(len(older), total - len(fresh)))
+        return fresh + replay, fresh_count
+
+    def _encode(self, examples: List[Tuple[str, str]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """ترميز (سؤال، رد) مع تبطين يدوي، وتُستثنى ال tokens المبطنة من الخسارة"""
+        pad_id = self.tokenizer.eos_token_id
+        encoded = [
+            self.tokenizer.encode(f"{user_input}\n{ai_response}", max_length=self.max_length, truncation=True)
+            for user_input, ai_response in examples
+        ]
+        longest = max(len(ids) for ids in encoded)
+        device = self.model_handle.device
+        input_ids = torch.tensor([ids + [pad_id] * (longest - len(ids)) for ids in encoded], device=device)
+        attention_mask = torch.tensor(
+            [[1] * len(ids) + [0] * (longest - len(ids)) for ids in encoded], device=device
+        )
+        labels = input_ids.masked_fill(attention_mask == 0, -100)
+        return input_ids, attention_mask, labels
+
+    def _train_round(self) -> None:
+        """خطوة مُحسِّن واحدة مجمعة من عدة دفعات صغيرة"""
+        examples, fresh_count = self._draw_examples()
+        micro_batches = [
+            examples[i:i + self.batch_size] for i in range(0, len(examples), self.batch_size)
+        ][:self.accumulation_steps]
+        model = self.model_handle.model
+        started = time.perf_counter()
+        total_loss = 0.0
+
+        self.optimizer.zero_grad()
+        for micro_batch in micro_batches:
+            # عودة نشاط المستخدم تلغي الجولة: التوليد أهم من التدريب
+            if self._stop_event.is_set() or not self._is_idle():
+                self.optimizer.zero_grad()
+                self._stats["rounds_aborted"] += 1
+                return
+
+            input_ids, attention_mask, labels = self._encode(micro_batch)
+            # القفل يُحجز لكل دفعة صغيرة فقط حتى لا ينتظر التوليد الجولة كاملة
+            with self.model_handle.lock:
+                model.train()
+                try:
+                    loss = model(input_ids, attention_mask=attention_mask, labels=labels).loss
+                    (loss / len(micro_batches)).backward()
+                finally:
+                    model.eval()
+            total_loss += loss.item()
+
+        with self.model_handle.lock:
+            self.optimizer.step()
+            self.optimizer.zero_grad()
+            self.model_handle.bump_weights_version()
+
+        average_loss = total_loss / len(micro_batches)
+        with self._lock:
+            self._fresh = max(self._fresh - fresh_count, 0)
+            self._stats["steps"] += 1
+            self._stats["examples_trained"] += len(examples)
+            self._stats["training_seconds"] += time.perf_counter() - started
+            self._stats["last_loss"] = average_loss
+
+        if self.on_step is not None:
+            self.on_step(average_loss)
+
+    def get_stats(self) -> Dict:
+        """عمق الطابور وسرعة التدريب"""
+        with self._lock:
+            seconds = self._stats["training_seconds"]
+            return dict(
+                self._stats,
+                queue_depth=self._fresh,
+                buffer_size=len(self._buffer),
+                examples_per_second=self._stats["examples_trained"] / seconds if seconds else 0.0
+            )
@@ -0,0 +1,231 @@
+# ------------------------ النسخ الاحتياطي أثناء التشغيل ------------------------
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.request import pathname2url
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+BACKUP_DIR = "backups"
+
+
+class BackupJob:
+    """
+    نسخة متسقة من القاعدة عبر واجهة SQLite للنسخ على اتصال خاص، بخطوات من
+    pages صفحة مع توقف sleep ثانية بين الخطوات، فلا تتوقف الكتابة أثناء النسخ.
+    (معامل sleep في sqlite3 لا ينتظر إلا عند BUSY/LOCKED، لذلك يتم التوقف في
+    دالة التقدم بعد كل خطوة.)
+    """
+
+    def __init__(self, db_path: str, target_path: str, pages: int = 256, sleep: float = 0.05,
+                 progress: Optional[Callable[[float], None]] = None):
+        self.db_path = db_path
+        self.target_path = target_path
+        self.pages = pages
+        self.sleep = sleep
+        self.progress_callback = progress
+        self.progress = 0.0
+        self.total_pages = 0
+        self.elapsed = 0.0
+
+    def _on_progress(self, status: int, remaining: int, total: int) -> None:
+        self.total_pages = total
+        self.progress = (total - remaining) / total if total else 1.0
+        if self.progress_callback is not None:
+            self.progress_callback(self.progress)
+        if remaining and self.sleep:
+            time.sleep(self.sleep)
+
+    def run(self) -> bool:
+        """كتابة النسخة في ملف مؤقت ثم استبدال الهدف به (لا تبقى نسخة نصف مكتوبة)"""
+        started = time.perf_counter()
+        tmp_path = f"{self.target_path}.tmp"
+        source = sqlite3.connect(
+            f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro", uri=True, isolation_level=None
+        )
+        try:
+            # معاملة قراءة مفتوحة تثبت لقطة WAL: الكتابات الجديدة لا تعيد النسخ من البداية
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target, pages=self.pages, progress=self._on_progress, sleep=self.sleep)
+            finally:
+                target.close()
+            source.execute("COMMIT")
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.target_path)
+            self.progress = 1.0
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Backup failed: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        finally:
+            source.close()
+            self.elapsed = time.perf_counter() - started
+
+
+class SnapshotStore:
+    """
+    لقطات تزايدية: نسخة القاعدة تُقسم لكتل من chunk_pages صفحة، وكل كتلة تُخزن
+    مضغوطة مرة واحدة باسم بصمتها (SHA-256)، فاللقطة الليلية تكتب الكتل المتغيرة فقط
+    ويكفي ملف فهرس صغير لكل لقطة.
+
+    كل لقطة تمر بنسخة مؤقتة كاملة من القاعدة (snapshot.db) تُحذف بعد تقسيمها، فيلزم
+    مساحة حرة بحجم القاعدة أثناء النسخ؛ قراءة صفحات الملف العامل مباشرة لا تعطي لقطة
+    متسقة مع وجود WAL.
+    """
+
+    def __init__(self, directory: str = BACKUP_DIR, chunk_pages: int = 16, keep_last: int = 7):
+        self.directory = directory
+        self.chunk_pages = chunk_pages
+        self.keep_last = keep_last
+        self.objects_dir = os.path.join(directory, "objects")
+        self.snapshots_dir = os.path.join(directory, "snapshots")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def snapshots(self) -> List[str]:
+        """أسماء اللقطات من الأقدم للأحدث"""
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith(".json"))
+
+    def create(self, db_path: str, pages: int = 256, sleep: float = 0.05,
+               progress: Optional[Callable[[float], None]] = None) -> Optional[Dict[str, Any]]:
+        """
+        لقطة جديدة من القاعدة العاملة.
+
+        Returns:
+            dict: فهرس اللقطة مع عدد الكتل الجديدة المكتوبة، أو None عند الفشل.
+        """
+        copy_path = os.path.join(self.directory, "snapshot.db")
+        job = BackupJob(db_path, copy_path, pages=pages, sleep=sleep, progress=progress)
+        if not job.run():
+            return None
+        try:
+            chunks, written = [], 0
+            with open(copy_path, "rb") as f:
+                # حجم الصفحة في ترويسة الملف (البايتان 16-17، والقيمة 1 تعني 65536)
+                header = f.read(100)
+                page_size = int.from_bytes(header[16:18], "big")
+                page_size = 65536 if page_size == 1 else page_size
+                chunk_size = page_size * self.chunk_pages
+                f.seek(0)
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    digest = hashlib.sha256(data).hexdigest()
+                    chunks.append(digest)
+                    path = self._object_path(digest)
+                    if not os.path.exists(path):
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        with open(f"{path}.tmp", "wb") as out:
+                            out.write(zlib.compress(data))
+                        os.replace(f"{path}.tmp", path)
+                        written += 1
+            name = datetime.now().strftime("%Y%m%d-%H%M%S")
+            manifest = {
+                "name": name,
+                "created_at": time.time(),
+                "page_size": page_size,
+                "chunk_pages": self.chunk_pages,
+                "size": os.path.getsize(copy_path),
+                "chunks": chunks,
+                "new_chunks": written
+            }
+            manifest_path = os.path.join(self.snapshots_dir, f"{name}.json")
+            with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+        finally:
+            if os.path.exists(copy_path):
+                os.remove(copy_path)
+        self.prune()
+        return manifest
+
+    def restore(self, name: str, target_path: str) -> bool:
+        """إعادة بناء ملف القاعدة من لقطة (التطبيق متوقف أو لمسار جديد)"""
+        try:
+            with open(os.path.join(self.snapshots_dir, f"{name}.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            tmp_path = f"{target_path}.tmp"
+            with open(tmp_path, "wb") as out:
+                for digest in manifest["chunks"]:
+                    with open(self._object_path(digest), "rb") as chunk:
+                        out.write(zlib.decompress(chunk.read()))
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, target_path)
+            return True
+        except (OSError, ValueError, KeyError, zlib.error) as e:
+            print(f"❌ فشل استرجاع اللقطة {name}: {str(e)}")
+            return False
+
+    def prune(self) -> int:
+        """حذف اللقطات الأقدم من آخر keep_last والكتل التي لم تعد أي لقطة تشير إليها"""
+        names = self.snapshots()
+        for name in names[:-self.keep_last]:
+            os.remove(os.path.join(self.snapshots_dir, f"{name}.json"))
+        referenced = set()
+        for name in self.snapshots():
+            with open(os.path.join(self.snapshots_dir, f"{name}.json"), "r", encoding="utf-8") as f:
+                referenced.update(json.load(f)["chunks"])
+        removed = 0
+        for prefix in os.listdir(self.objects_dir):
+            folder = os.path.join(self.objects_dir, prefix)
+            for digest in os.listdir(folder):
+                if digest not in referenced:
+                    os.remove(os.path.join(folder, digest))
+                    removed += 1
+        return removed
+
+
+class BackupScheduler(threading.Thread):
+    """لقطة تزايدية دورية في الخلفية (ليلية افتراضياً)"""
+
+    def __init__(self, db_path: str, store: SnapshotStore, interval: float = 24 * 3600,
+                 initial_delay: float = 600):
+        super().__init__(name="BackupScheduler", daemon=True)
+        self.db_path = db_path
+        self.store = store
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        delay = self.initial_delay
+        while not self._stop_event.wait(delay):
+            try:
+                snapshot = self.store.create(self.db_path)
+                if snapshot is not None:
+                    self.last_snapshot = snapshot
+                    print(f"✅ نسخة احتياطية {snapshot['name']}: {snapshot['new_chunks']} كتلة جديدة "
+                          f"من {len(snapshot['chunks'])}")
+            except Exception as e:
+                print(f"❌ خطأ في النسخ الاحتياطي: {str(e)}")
+            delay = self.interval
+
+
+def schedule_backups(db_path: str, directory: str = BACKUP_DIR,
+                     interval: float = 24 * 3600) -> BackupScheduler:
+    """بدء النسخ الاحتياطي الدوري لملف القاعدة"""
+    scheduler = BackupScheduler(db_path, SnapshotStore(directory), interval=interval)
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,248 @@
+# ------------------------ نقاط التحقق الذرية وتبديلها أثناء التشغيل ------------------------
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import threading
+import time
+import torch
+
+
+CHECKPOINT_DIR = os.path.join("ai_model", "checkpoints")
+MANIFEST_NAME = "manifest.json"
+
+
+def _atomic_write(path: str, write: Callable[[Any], None], mode: str = "wb") -> None:
+    """الكتابة في ملف مؤقت بجانب الهدف ثم استبداله، فلا يبقى ملف نصف مكتوب بعد انهيار"""
+    tmp_path = f"{path}.tmp"
+    encoding = None if "b" in mode else "utf-8"
+    with open(tmp_path, mode, encoding=encoding) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointManager:
+    """
+    كتابة نقاط التحقق بإصدارات مرقمة مع الاحتفاظ بآخر N منها ومقاييسها،
+    وتأجيل طلبات الحفظ المتقاربة إلى كتابة واحدة
+    """
+
+    def __init__(self, directory: str = CHECKPOINT_DIR, keep_last: int = 3,
+                 debounce_seconds: float = 30.0):
+        self.directory = directory
+        self.keep_last = keep_last
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    # ------------------------ الفهرس ------------------------
+    def _read_manifest(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"❌ فهرس نقاط التحقق تالف: {str(e)}")
+        return {"latest": None, "versions": []}
+
+    def _write_manifest(self) -> None:
+        _atomic_write(
+            os.path.join(self.directory, MANIFEST_NAME),
+            lambda f: json.dump(self.manifest, f, ensure_ascii=False, indent=2),
+            mode="w"
+        )
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """الإصدارات المحفوظة من الأقدم للأحدث مع مقاييسها"""
+        return list(self._read_manifest()["versions"])
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """بيانات أحدث إصدار (من القرص، قد تكون كتبته عملية أخرى)"""
+        manifest = self._read_manifest()
+        for entry in manifest["versions"]:
+            if entry["version"] == manifest["latest"]:
+                return entry
+        return None
+
+    # ------------------------ الحفظ ------------------------
+    def request_save(self, snapshot: Callable[[], Dict[str, torch.Tensor]],
+                     metrics: Optional[Dict] = None, meta: Optional[Dict] = None,
+                     lock=None, detached: bool = False) -> None:
+        """
+        طلب حفظ مؤجل: الطلبات خلال debounce_seconds تُدمج في كتابة واحدة بآخر الأوزان.
+
+        Args:
+            snapshot: دالة تُرجع state_dict لحظة الكتابة الفعلية.
+            lock: قفل يمنع تغير الأوزان أثناء أخذ اللقطة.
+            detached (bool): اللقطة نسخة مستقلة (أوزان المحولات الصغيرة مثلاً) فيُحرر
+                القفل بعد أخذها وتتم الكتابة بعده؛ وإلا فهي الأوزان الحية نفسها وتُكتب
+                والقفل محجوز بدلاً من نسخة كاملة ثانية في الذاكرة.
+        """
+        with self._lock:
+            self._pending = {"snapshot": snapshot, "metrics": metrics or {}, "meta": meta or {},
+                             "lock": lock, "detached": detached}
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> Optional[int]:
+        """كتابة الطلب المؤجل فوراً (عند الإغلاق مثلاً)"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending is None:
+            return None
+        try:
+            if pending["lock"] is None:
+                return self.save(pending["snapshot"](), pending["metrics"], pending["meta"])
+            if pending["detached"]:
+                with pending["lock"]:
+                    state = pending["snapshot"]()
+                return self.save(state, pending["metrics"], pending["meta"])
+            with pending["lock"]:
+                return self.save(pending["snapshot"](), pending["metrics"], pending["meta"])
+        except Exception as e:
+            print(f"❌ خطأ في حفظ نقطة التحقق: {str(e)}")
+            return None
+
+    def save(self, state: Dict[str, torch.Tensor], metrics: Optional[Dict] = None,
+             meta: Optional[Dict] = None) -> int:
+        """كتابة إصدار جديد ذرياً وتحديث مؤشر latest ثم حذف الإصدارات الأقدم من N"""
+        manifest = self._read_manifest()
+        version = max([e["version"] for e in manifest["versions"]], default=0) + 1
+        file_name = f"checkpoint-{version:06d}.bin"
+        _atomic_write(os.path.join(self.directory, file_name), lambda f: torch.save(state, f))
+
+        manifest["versions"].append(dict(
+            meta or {},
+            version=version,
+            file=file_name,
+            created_at=time.time(),
+            metrics=metrics or {}
+        ))
+        manifest["latest"] = version
+
+        # الاحتفاظ بآخر N إصدارات فقط
+        removed = manifest["versions"][:-self.keep_last]
+        manifest["versions"] = manifest["versions"][-self.keep_last:]
+        self.manifest = manifest
+        self._write_manifest()
+        for entry in removed:
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except OSError:
+                pass
+        return version
+
+    def load(self, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        تحميل إصدار (الأحدث افتراضياً).
+
+        Returns:
+            dict: بيانات الإصدار مع الأوزان في المفتاح "state"، أو None.
+        """
+        entry = self.latest() if version is None else next(
+            (e for e in self.versions() if e["version"] == version), None
+        )
+        if entry is None:
+            return None
+        # mmap: الأوزان تُقرأ من الملف عند نسخها داخل النموذج بدل نسخة ثانية كاملة في الذاكرة
+        state = torch.load(os.path.join(self.directory, entry["file"]), map_location="cpu",
+                           mmap=True, weights_only=True)
+        return dict(entry, state=state)
+
+
+# ------------------------ التبديل داخل النموذج العامل ------------------------
+def hot_swap(handle, checkpoint: Dict[str, Any]) -> bool:
+    """
+    نسخ أوزان نقطة التحقق داخل أوزان النموذج المشترك في مكانها (بدون نسخة ثانية).
+    القفل المشترك يضمن أن التبديل يتم بين الطلبات وليس أثناء توليد رد.
+    """
+    if handle.key[1] == "qint8":
+        # الأوزان المكممة لا تقابل مفاتيح نقطة التحقق العائمة
+        return False
+
+    model = handle.model
+    with handle.lock:
+        if checkpoint.get("kind") == "adapter":
+            from adapters import inject_lora
+            config = checkpoint.get("adapter_config") or {}
+            handle.get_extra("lora_adapters", lambda: inject_lora(
+                model,
+                target_modules=config.get("target_modules", ("c_attn",)),
+                rank=config.get("rank", 8),
+                alpha=config.get("alpha", 16.0),
+                dropout=config.get("dropout", 0.05)
+            ))
+
+        own = model.state_dict()
+        missing = [name for name in checkpoint["state"] if name not in own]
+        if missing:
+            print(f"❌ نقطة التحقق لا تطابق النموذج ({len(missing)} مفتاح غير معروف)")
+            return False
+        with torch.no_grad():
+            for name, tensor in checkpoint["state"].items():
+                own[name].copy_(tensor)
+        handle.set_extra("checkpoint_version", checkpoint["version"])
+        handle.bump_weights_version()
+    print(f"✅ تم تحميل نقطة التحقق رقم {checkpoint['version']}")
+    return True
+
+
+class CheckpointWatcher(threading.Thread):
+    """يراقب فهرس نقاط التحقق ويبدل أحدث إصدار داخل النموذج العامل بدون إعادة تشغيل"""
+
+    def __init__(self, handle, manager: CheckpointManager, poll_interval: float = 10.0):
+        super().__init__(name="CheckpointWatcher", daemon=True)
+        self.handle = handle
+        self.manager = manager
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ خطأ في مراقبة نقاط التحقق: {str(e)}")
+
+    def check(self) -> bool:
+        """تبديل أحدث إصدار إن كان أحدث من المحمّل حالياً"""
+        entry = self.manager.latest()
+        current = self.handle.get_extra("checkpoint_version")
+        if entry is None or entry["version"] == current:
+            return False
+        if entry.get("pid") == os.getpid() and tuple(entry.get("model_key", ())) == self.handle.key:
+            # كُتبت من تدريب على نفس النموذج في هذه العملية: الأوزان الحية أحدث منها
+            self.handle.set_extra("checkpoint_version", entry["version"])
+            return False
+        checkpoint = self.manager.load(entry["version"])
+        if checkpoint is None or not hot_swap(self.handle, checkpoint):
+            # لا نعيد محاولة نفس الإصدار في كل دورة
+            self.handle.set_extra("checkpoint_version", entry["version"])
+            return False
+        return True
+
+
+def watch_checkpoints(handle, directory: str = CHECKPOINT_DIR) -> Optional[CheckpointWatcher]:
+    """مراقب واحد لكل نموذج مشترك (يُنشأ عند أول طلب)"""
+    if handle.key[1] == "qint8":
+        return None
+
+    def start():
+        watcher = CheckpointWatcher(handle, CheckpointManager(directory))
+        watcher.check()
+        watcher.start()
+        return watcher
+    return handle.get_extra("checkpoint_watcher", start)
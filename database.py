@@ -1,368 +1,660 @@
-import sqlite3
-from datetime import datetime
-import json
-from typing import Optional, List, Dict, Any
-
-class AILearningDatabase:
-    def __init__(self, db_path="ai_learning.db"):
-        try:
-            self.conn = sqlite3.connect(db_path)
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            self.create_tables()
-            print("تم الاتصال بقاعدة البيانات بنجاح")  # رسالة تأكيد
-        except Exception as e:
-            print(f"فشل الاتصال بقاعدة البيانات: {str(e)}")
-            raise
-    
-    def create_tables(self) -> None:
-        """إنشاء جميع الجداول المطلوبة"""
-        cursor = self.conn.cursor()
-        
-        # جدول المعلومات الشخصية (جديد)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS personal_info (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL,
-            last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-
-        # جدول الأسئلة الشائعة (جديد)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS common_questions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            question TEXT UNIQUE NOT NULL,
-            answer TEXT NOT NULL,
-            usage_count INTEGER DEFAULT 1,
-            last_used DATETIME DEFAULT CURRENT_TIMESTAMP,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-
-        self.conn.execute("""
-           CREATE TABLE IF NOT EXISTS conversations (
-               id INTEGER PRIMARY KEY,
-               user_input TEXT,
-               ai_response TEXT,
-               category TEXT,
-               timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-           )
-       """)
-
-        # ----- إضافة الفهارس هنا -----
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON conversations (category)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON conversations (timestamp)")
-        # ----------------------------
-
-        self.conn.commit()
-
-        
-        # جدول التفاعلات الأساسية (معدل)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS interactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_input TEXT NOT NULL,
-            ai_response TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            is_valuable BOOLEAN DEFAULT 0,
-            pattern_detected TEXT,
-            sentiment TEXT,
-            confidence REAL DEFAULT 0.5
-        )
-        """)
-        
-        # جدول أنماط التعلم (معدل)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS learning_patterns (
-            pattern_name TEXT PRIMARY KEY,
-            detection_keywords TEXT NOT NULL,
-            example_questions TEXT,
-            count INTEGER DEFAULT 1,
-            last_used DATETIME,
-            response_style TEXT
-        )
-        """)
-        
-        # جدول التحسينات (معدل)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS improvements (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            interaction_id INTEGER NOT NULL,
-            improvement_type TEXT NOT NULL,
-            details TEXT,
-            improvement_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (interaction_id) REFERENCES interactions(id) ON DELETE CASCADE
-        )
-        """)
-        
-        # إنشاء فهارس لتحسين الأداء
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_patterns_count ON learning_patterns(count)")
-        
-        self.conn.commit()
-    
-    def get_common_questions(self) -> Dict[str, str]:
-        """استرجاع الأسئلة الشائعة مع تحديث تاريخ الاستخدام"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # استرجاع الأسئلة مرتبة حسب الأكثر استخداماً
-            cursor.execute("""
-            SELECT question, answer 
-            FROM common_questions 
-            ORDER BY usage_count DESC, last_used DESC
-            """)
-            
-            results = cursor.fetchall()
-            
-            if not results:
-                # إذا لم توجد أسئلة، نقوم بإضافة الأسئلة الافتراضية
-                default_questions = [
-                    ("ما هو اسمك؟", "أنا ماني، مساعدك الذكي!"),
-                    ("كيف اتواصل معك", "يمكنك التحدث معي مباشرة هنا أو استخدام الأمر 'مساعدة'"),
-                    ("من أنا", "أنت المستخدم الذي أتفاعل معه وأتعلم منه يومياً")
-                ]
-                
-                cursor.executemany("""
-                INSERT INTO common_questions (question, answer) 
-                VALUES (?, ?)
-                """, default_questions)
-                
-                self.conn.commit()
-                return dict(default_questions)
-            
-            return dict(results)
-            
-        except sqlite3.Error as e:
-            print(f"خطأ في استرجاع الأسئلة الشائعة: {str(e)}")
-            return {}
-
-    def update_question_usage(self, question: str) -> bool:
-        """تحديث عداد استخدام السؤال"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-            UPDATE common_questions 
-            SET 
-                usage_count = usage_count + 1,
-                last_used = CURRENT_TIMESTAMP
-            WHERE question = ?
-            """, (question,))
-            
-            self.conn.commit()
-            return cursor.rowcount > 0
-        except sqlite3.Error as e:
-            print(f"خطأ في تحديث استخدام السؤال: {str(e)}")
-            return False        
-
-
-    def _initialize_default_data(self) -> None:
-        """إدخال البيانات الأولية عند التشغيل الأول"""
-        # ... (الكود الحالي)
-        
-        # تهيئة الأسئلة الشائعة إذا كان الجدول فارغاً
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM common_questions")
-        if cursor.fetchone()[0] == 0:
-            default_questions = [
-                ("ما هو اسمك؟", "أنا ماني، مساعدك الذكي!"),
-                ("كيف اتواصل معك", "يمكنك التحدث معي مباشرة هنا أو استخدام الأمر 'مساعدة'"),
-                ("من أنا", "أنت المستخدم الذي أتفاعل معه وأتعلم منه يومياً")
-            ]
-            
-            cursor.executemany("""
-            INSERT INTO common_questions (question, answer) 
-            VALUES (?, ?)
-            """, default_questions)
-            
-        self.conn.commit()
-
-    def find_similar_question(self, user_input: str) -> Optional[str]:
-        """البحث عن سؤال مشابه في الأسئلة الشائعة"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-            SELECT question 
-            FROM common_questions 
-            WHERE question LIKE ? 
-            ORDER BY usage_count DESC 
-            LIMIT 1
-            """, (f"%{user_input}%",))
-            
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except sqlite3.Error as e:
-            print(f"خطأ في البحث عن سؤال مشابه: {str(e)}")
-            return None
-
-
-    def save_personal_info(self, key: str, value: str) -> bool:
-        """حفظ المعلومات الشخصية في قاعدة البيانات"""
-        try:
-            self.conn.execute(
-                "INSERT OR REPLACE INTO personal_info (key, value) VALUES (?, ?)",
-                (key, value)
-            )
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error saving personal info: {str(e)}")
-            return False
-
-    def get_personal_info(self, key: str) -> Optional[str]:
-        """استرجاع المعلومات الشخصية من قاعدة البيانات"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT value FROM personal_info WHERE key = ?", (key,))
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except sqlite3.Error as e:
-            print(f"Error retrieving personal info: {str(e)}")
-            return None
-
-    def log_interaction(self, user_input: str, ai_response: str, 
-                       is_valuable: bool = False, pattern: str = None,
-                       sentiment: str = None, confidence: float = 0.5) -> Optional[int]:
-        """تسجيل تفاعل جديد في قاعدة البيانات"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-            INSERT INTO interactions 
-            (user_input, ai_response, is_valuable, pattern_detected, sentiment, confidence)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_input, ai_response, is_valuable, pattern, sentiment, confidence))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.Error as e:
-            print(f"Error logging interaction: {str(e)}")
-            return None
-
-    def detect_and_log_pattern(self, user_input: str) -> List[str]:
-        """الكشف عن الأنماط وتحديثها في قاعدة البيانات"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT pattern_name, detection_keywords FROM learning_patterns")
-            patterns = cursor.fetchall()
-            
-            detected = []
-            for pattern_name, keywords_json in patterns:
-                keywords = json.loads(keywords_json)
-                if any(kw in user_input for kw in keywords):
-                    detected.append(pattern_name)
-                    self._update_pattern(pattern_name, user_input)
-            
-            return detected
-        except (sqlite3.Error, json.JSONDecodeError) as e:
-            print(f"Error detecting patterns: {str(e)}")
-            return []
-
-    def _update_pattern(self, pattern_name: str, example: str) -> bool:
-        """تحديث بيانات النمط في قاعدة البيانات"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # الحصول على الأمثلة الحالية
-            cursor.execute("SELECT example_questions FROM learning_patterns WHERE pattern_name = ?", (pattern_name,))
-            current_examples = cursor.fetchone()[0] or "[]"
-            
-            # تحديث الأمثلة
-            examples = json.loads(current_examples)
-            examples.append(example)
-            if len(examples) > 5:  # حفظ آخر 5 أمثلة فقط
-                examples = examples[-5:]
-            
-            # تحديث النمط
-            cursor.execute("""
-            UPDATE learning_patterns 
-            SET count = count + 1,
-                last_used = CURRENT_TIMESTAMP,
-                example_questions = ?
-            WHERE pattern_name = ?
-            """, (json.dumps(examples, ensure_ascii=False), pattern_name))
-            
-            self.conn.commit()
-            return True
-        except (sqlite3.Error, json.JSONDecodeError) as e:
-            print(f"Error updating pattern: {str(e)}")
-            return False
-
-    def get_conversation_history(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """استرجاع سجل المحادثات"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-            SELECT user_input, ai_response, timestamp 
-            FROM interactions 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-            """, (limit,))
-            
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        except sqlite3.Error as e:
-            print(f"Error fetching conversation history: {str(e)}")
-            return []
-
-    def get_learning_stats(self) -> Dict[str, Any]:
-        """الحصول على إحصائيات التعلم"""
-        stats = {
-            "total_interactions": 0,
-            "valuable_interactions": 0,
-            "top_patterns": []
-        }
-        
-        try:
-            cursor = self.conn.cursor()
-            
-            # عدد التفاعلات الكلي
-            cursor.execute("SELECT COUNT(*) FROM interactions")
-            stats["total_interactions"] = cursor.fetchone()[0]
-            
-            # التفاعلات القيمة
-            cursor.execute("SELECT COUNT(*) FROM interactions WHERE is_valuable = 1")
-            stats["valuable_interactions"] = cursor.fetchone()[0]
-            
-            # الأنماط الأكثر استخداماً
-            cursor.execute("""
-            SELECT pattern_name, count 
-            FROM learning_patterns 
-            ORDER BY count DESC 
-            LIMIT 3
-            """)
-            stats["top_patterns"] = [{"name": row[0], "count": row[1]} for row in cursor.fetchall()]
-            
-        except sqlite3.Error as e:
-            print(f"Error getting learning stats: {str(e)}")
-        
-        return stats
-
-    def close(self) -> None:
-        """إغلاق اتصال قاعدة البيانات بشكل آمن"""
-        try:
-            if self.conn:
-                self.conn.close()
-        except sqlite3.Error as e:
-            print(f"Error closing database: {str(e)}")
-
-    def __del__(self):
-        """تنظيف الموارد عند الحذف"""
-        self.close()
-
-    def backup_database(self, backup_path: str) -> bool:
-        """إنشاء نسخة احتياطية من قاعدة البيانات"""
-        try:
-            backup_conn = sqlite3.connect(backup_path)
-            with backup_conn:
-                self.conn.backup(backup_conn)
-            backup_conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Backup failed: {str(e)}")
-            return False
-    
-    # في ملف database.py
-    def forget_knowledge(self, concept: str):
-        """حذف مفهوم من قاعدة المعرفة"""
-        query = "DELETE FROM knowledge_base WHERE concept = ?"
-        self.cursor.execute(query, (concept,))
-        self.conn.commit()
\ No newline at end of file
+import sqlite3
+from datetime import datetime
+import json
+import math
+import time
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
+from arabic_text import normalize_arabic
+from archive import get_archive_manager
+from backup import BACKUP_DIR, BackupJob, BackupScheduler, schedule_backups
+from keyword_matcher import KeywordMatcher
+from migrations import SEARCH_INDEXES, fill_search_index, has_search_index, migrate
+from storage import get_storage
+from write_behind import get_write_behind
+
+class AILearningDatabase:
+    def __init__(self, db_path="ai_learning.db"):
+        try:
+            started = time.perf_counter()
+            # خدمة تخزين مشتركة: WAL، اتصال قراءة لكل خيط، وكاتب واحد مُسلسل
+            self.storage = get_storage(db_path)
+            self._term_docs: Dict[tuple, int] = {}
+            self._pattern_matcher: Optional[Tuple[int, KeywordMatcher]] = None
+            self.create_tables()
+            # كتابات المحادثة تُجمع في معاملة واحدة دورية بخيط كتابة مشترك
+            self.write_behind = get_write_behind(db_path)
+            # التفاعلات القديمة تُنقل دورياً لملفات أرشيف شهرية
+            self.archive = get_archive_manager(db_path)
+            # زمن الفتح: أجزاء من المللي ثانية عندما يكون المخطط محدثاً
+            self.open_ms = (time.perf_counter() - started) * 1000
+            print(f"تم الاتصال بقاعدة البيانات بنجاح ({self.open_ms:.1f} ms)")  # رسالة تأكيد
+        except Exception as e:
+            print(f"فشل الاتصال بقاعدة البيانات: {str(e)}")
+            raise
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """اتصال القراءة الخاص بالخيط الحالي (الكتابة عبر storage.write())"""
+        return self.storage.reader()
+
+    def create_tables(self) -> None:
+        """تطبيق ترحيلات المخطط المعلقة (لا تُنفذ أي DDL إذا كان الملف محدثاً)"""
+        migrate(self.storage)
+        self.fts_enabled = has_search_index(self.conn)
+
+    def get_common_questions(self) -> Dict[str, str]:
+        """استرجاع الأسئلة الشائعة مع تحديث تاريخ الاستخدام"""
+        try:
+            cursor = self.conn.cursor()
+            
+            # استرجاع الأسئلة مرتبة حسب الأكثر استخداماً
+            cursor.execute("""
+            SELECT question, answer 
+            FROM common_questions 
+            ORDER BY usage_count DESC, last_used DESC
+            """)
+            
+            results = cursor.fetchall()
+            
+            if not results:
+                # إذا لم توجد أسئلة، نقوم بإضافة الأسئلة الافتراضية
+                default_questions = [
+                    ("ما هو اسمك؟", "أنا ماني، مساعدك الذكي!"),
+                    ("كيف اتواصل معك", "يمكنك التحدث معي مباشرة هنا أو استخدام الأمر 'مساعدة'"),
+                    ("من أنا", "أنت المستخدم الذي أتفاعل معه وأتعلم منه يومياً")
+                ]
+                
+                with self.storage.write() as conn:
+                    conn.executemany("""
+                    INSERT OR IGNORE INTO common_questions (question, answer) 
+                    VALUES (?, ?)
+                    """, default_questions)
+                
+                return dict(default_questions)
+            
+            return dict(results)
+            
+        except sqlite3.Error as e:
+            print(f"خطأ في استرجاع الأسئلة الشائعة: {str(e)}")
+            return {}
+
+    def update_question_usage(self, question: str) -> bool:
+        """تحديث عداد استخدام السؤال (كتابة مؤجلة)"""
+        try:
+            self.write_behind.submit("update_question_usage", question=question)
+            return True
+        except Exception as e:
+            print(f"خطأ في تحديث استخدام السؤال: {str(e)}")
+            return False        
+
+
+    def _initialize_default_data(self) -> None:
+        """إدخال البيانات الأولية عند التشغيل الأول"""
+        # ... (الكود الحالي)
+        
+        # تهيئة الأسئلة الشائعة إذا كان الجدول فارغاً
+        with self.storage.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM common_questions")
+            if cursor.fetchone()[0] == 0:
+                default_questions = [
+                    ("ما هو اسمك؟", "أنا ماني، مساعدك الذكي!"),
+                    ("كيف اتواصل معك", "يمكنك التحدث معي مباشرة هنا أو استخدام الأمر 'مساعدة'"),
+                    ("من أنا", "أنت المستخدم الذي أتفاعل معه وأتعلم منه يومياً")
+                ]
+                
+                cursor.executemany("""
+                INSERT INTO common_questions (question, answer) 
+                VALUES (?, ?)
+                """, default_questions)
+
+    def get_pattern_examples(self, pattern_name: str) -> List[str]:
+        """آخر أمثلة النمط من الأقدم للأحدث"""
+        try:
+            self.write_behind.flush()
+            cursor = self.conn.execute(
+                "SELECT example FROM pattern_examples WHERE pattern_name = ? ORDER BY seq",
+                (pattern_name,)
+            )
+            return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching pattern examples: {str(e)}")
+            return []
+
+    def lookup_question(self, user_input: str, prefix: bool = False) -> Optional[Tuple[str, str]]:
+        """
+        (السؤال، الإجابة) لسؤال شائع يطابق المدخل بعد التوحيد، أو يبدأ به إذا كان prefix.
+        البحثان نطاقات على فهرس question_norm.
+        """
+        normalized = normalize_arabic(user_input)
+        if not normalized:
+            return None
+        try:
+            row = self.conn.execute("""
+            SELECT question, answer FROM common_questions
+            WHERE question_norm = ?
+            ORDER BY usage_count DESC LIMIT 1
+            """, (normalized,)).fetchone()
+            if row is None and prefix:
+                # كل النصوص التي تبدأ بالبادئة تقع بينها وبين البادئة + أكبر محرف
+                row = self.conn.execute("""
+                SELECT question, answer FROM common_questions
+                WHERE question_norm >= ? AND question_norm < ?
+                ORDER BY usage_count DESC LIMIT 1
+                """, (normalized, normalized + "\U0010ffff")).fetchone()
+            return tuple(row) if row else None
+        except sqlite3.Error as e:
+            print(f"خطأ في البحث عن سؤال مطابق: {str(e)}")
+            return None
+
+    # ------------------------ البحث النصي الكامل (FTS5) ------------------------
+    def rebuild_search_index(self) -> None:
+        """إعادة بناء فهارس البحث من الجداول الأصلية"""
+        if not self.fts_enabled:
+            return
+        with self.storage.write() as conn:
+            cursor = conn.cursor()
+            for table, fts, columns in SEARCH_INDEXES:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')")
+                fill_search_index(cursor, table, fts, columns)
+
+    def _term_doc_count(self, fts: str, term: str) -> int:
+        """عدد الصفوف التي تحتوي الكلمة (مخزن مؤقتاً؛ القيمة التقريبية تكفي لاختيار الكلمات)"""
+        key = (fts, term)
+        count = self._term_docs.get(key)
+        if count is None:
+            if len(self._term_docs) > 10000:
+                self._term_docs.clear()
+            row = self.conn.execute(f"SELECT doc FROM {fts}_vocab WHERE term = ?", (term,)).fetchone()
+            count = row[0] if row else 0
+            if count:  # الكلمة غير الموجودة قد تُضاف لاحقاً فلا تُخزن
+                self._term_docs[key] = count
+        return count
+
+    def _match_query(self, fts: str, text: str, max_terms: int = 4,
+                     max_docs: int = 1000) -> Optional[str]:
+        """
+        تحويل مدخل المستخدم إلى استعلام MATCH آمن (أي كلمة من الكلمات).
+        كلفة bm25 تتناسب مع عدد الصفوف المطابقة، لذلك تُستبعد الكلمات الشائعة جداً
+        (أدوات الاستفهام مثلاً) ويُكتفى بأندر max_terms كلمات؛ وإذا كانت كل الكلمات
+        شائعة تُطلب كلها معاً.
+        """
+        terms = list(dict.fromkeys(normalize_arabic(text).split()))
+        counts = {term: self._term_doc_count(fts, term) for term in terms}
+        known = sorted((t for t in terms if counts[t]), key=counts.get)
+        if not known:
+            return None
+        quoted = ['"' + term.replace('"', '""') + '"' for term in known]
+        rare = [q for term, q in zip(known, quoted) if counts[term] <= max_docs][:max_terms]
+        return " OR ".join(rare) if rare else " AND ".join(quoted)
+
+    def _search(self, fts: str, sql: str, user_input: str, k: int, candidates: int) -> List[tuple]:
+        """
+        أفضل candidates نتيجة حسب bm25 (يستخدم ترتيب FTS5 المحسن)، ثم إعادة ترتيبها
+        بدمج bm25 مع عداد الاستخدام وإرجاع أفضل k
+        """
+        query = self._match_query(fts, user_input)
+        if query is None:
+            return []
+        rows = self.conn.execute(sql, (query, max(candidates, k))).fetchall()
+        # bm25 في FTS5 سالب (الأصغر أفضل)، والاستخدام يرفع الدرجة لوغاريتمياً
+        ranked = [(row[:-2], -row[-2] * (1 + math.log1p(row[-1] or 0))) for row in rows]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    def search_questions(self, user_input: str, k: int = 5, candidates: int = 50) -> List[Dict[str, Any]]:
+        """أقرب k أسئلة شائعة للمدخل مع درجاتها"""
+        try:
+            if not self.fts_enabled:
+                match = self.lookup_question(user_input, prefix=True)
+                return [{"question": match[0], "answer": match[1], "score": 0.0}] if match else []
+            results = self._search("common_questions_fts", """
+            SELECT q.id, q.question, q.answer, m.rank, q.usage_count
+            FROM (
+                SELECT rowid, rank FROM common_questions_fts
+                WHERE common_questions_fts MATCH ?
+                ORDER BY rank LIMIT ?
+            ) AS m
+            JOIN common_questions q ON q.id = m.rowid
+            """, user_input, k, candidates)
+            return [
+                {"id": row[0], "question": row[1], "answer": row[2], "score": score}
+                for row, score in results
+            ]
+        except sqlite3.Error as e:
+            print(f"خطأ في البحث عن سؤال مشابه: {str(e)}")
+            return []
+
+    def search_knowledge(self, user_input: str, k: int = 5, candidates: int = 50) -> List[Dict[str, Any]]:
+        """أقرب k عناصر معرفة للمدخل مع درجاتها"""
+        try:
+            if not self.fts_enabled:
+                return []
+            results = self._search("knowledge_fts", """
+            SELECT kb.id, kb.category, kb.concept, kb.details, kb.confidence, m.rank, kb.usage_count
+            FROM (
+                SELECT rowid, rank FROM knowledge_fts
+                WHERE knowledge_fts MATCH ?
+                ORDER BY rank LIMIT ?
+            ) AS m
+            JOIN knowledge_base kb ON kb.id = m.rowid
+            """, user_input, k, candidates)
+            return [
+                {
+                    "id": row[0], "category": row[1], "concept": row[2],
+                    "details": row[3], "confidence": row[4], "score": score
+                }
+                for row, score in results
+            ]
+        except sqlite3.Error as e:
+            print(f"Error searching knowledge: {str(e)}")
+            return []
+
+    def find_similar_question(self, user_input: str) -> Optional[str]:
+        """البحث عن سؤال مشابه: مطابقة بعد التوحيد، ثم بادئة، ثم البحث النصي"""
+        match = self.lookup_question(user_input, prefix=True)
+        if match is not None:
+            return match[0]
+        results = self.search_questions(user_input, k=1)
+        return results[0]["question"] if results else None
+
+    def save_personal_info(self, key: str, value: str) -> bool:
+        """حفظ المعلومات الشخصية في قاعدة البيانات (كتابة مؤجلة)"""
+        try:
+            self.write_behind.submit("save_personal_info", key=key, value=value)
+            return True
+        except Exception as e:
+            print(f"Error saving personal info: {str(e)}")
+            return False
+
+    def get_personal_info(self, key: str) -> Optional[str]:
+        """استرجاع المعلومات الشخصية من قاعدة البيانات"""
+        try:
+            self.write_behind.flush()  # قراءة آخر ما حُفظ
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT value FROM personal_info WHERE key = ?", (key,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+        except sqlite3.Error as e:
+            print(f"Error retrieving personal info: {str(e)}")
+            return None
+
+    def log_interaction(self, user_input: str, ai_response: str, 
+                       is_valuable: bool = False, pattern: str = None,
+                       sentiment: str = None, confidence: float = 0.5) -> Optional[int]:
+        """
+        تسجيل تفاعل جديد في قاعدة البيانات (كتابة مؤجلة).
+        يُرجع رقم العملية في طابور الكتابة وليس رقم الصف.
+        """
+        try:
+            return self.write_behind.submit(
+                "log_interaction",
+                user_input=user_input,
+                ai_response=ai_response,
+                is_valuable=is_valuable,
+                pattern=pattern,
+                sentiment=sentiment,
+                confidence=confidence
+            )
+        except Exception as e:
+            print(f"Error logging interaction: {str(e)}")
+            return None
+
+    def get_pattern_matcher(self) -> KeywordMatcher:
+        """
+        مطابق كلمات كل الأنماط المخزنة؛ يُبنى مرة واحدة ويُعاد بناؤه فقط عند تغير
+        إصدار الأنماط (قراءة صف واحد بالمفتاح لكل رسالة)
+        """
+        version = self.conn.execute(
+            "SELECT value FROM app_meta WHERE key = 'patterns_version'"
+        ).fetchone()[0]
+        cached = self._pattern_matcher
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rows = self.conn.execute("""
+        SELECT k.pattern_name, k.keyword_norm
+        FROM pattern_keywords k JOIN learning_patterns p ON p.pattern_name = k.pattern_name
+        ORDER BY p.rowid
+        """).fetchall()
+        keywords: Dict[str, List[str]] = {}
+        for pattern_name, keyword in rows:
+            keywords.setdefault(pattern_name, []).append(keyword)
+        matcher = KeywordMatcher(keywords.items())
+        self._pattern_matcher = (version, matcher)
+        return matcher
+
+    def match_patterns(self, user_input: str) -> List[str]:
+        """كل الأنماط التي تظهر إحدى كلماتها في المدخل (مرور واحد على النص)"""
+        try:
+            return self.get_pattern_matcher().match(user_input)
+        except sqlite3.Error as e:
+            print(f"Error detecting patterns: {str(e)}")
+            return []
+
+    def detect_and_log_pattern(self, user_input: str) -> List[str]:
+        """الكشف عن الأنماط وتحديثها في قاعدة البيانات"""
+        detected = self.match_patterns(user_input)
+        for pattern_name in detected:
+            self._update_pattern(pattern_name, user_input)
+        return detected
+
+    def register_patterns(self, patterns: Dict[str, Dict[str, Any]]) -> None:
+        """
+        إضافة أنماط معرفة في الكود (الاسم -> keywords و response_style) لجدول الأنماط
+        حتى تُطابق مع باقي الأنماط في مطابق واحد؛ الأنماط الموجودة لا تُستبدل
+        """
+        with self.storage.write() as conn:
+            conn.executemany("""
+            INSERT OR IGNORE INTO learning_patterns (pattern_name, detection_keywords, response_style, count)
+            VALUES (?, ?, ?, 0)
+            """, [
+                (name, json.dumps(config["keywords"], ensure_ascii=False), config.get("response_style"))
+                for name, config in patterns.items()
+            ])
+
+    def _update_pattern(self, pattern_name: str, example: str) -> bool:
+        """تحديث بيانات النمط في قاعدة البيانات (كتابة مؤجلة)"""
+        try:
+            self.write_behind.submit("update_pattern", pattern_name=pattern_name, example=example)
+            return True
+        except Exception as e:
+            print(f"Error updating pattern: {str(e)}")
+            return False
+
+    def load_cached_responses(self, limit: int = 500) -> List[tuple]:
+        """تحميل ذاكرة الردود المؤقتة (الأقدم أولاً حتى يكون الأحدث في نهاية ترتيب LRU)"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+            SELECT cache_key, candidates, created_at FROM (
+                SELECT cache_key, candidates, created_at
+                FROM response_cache
+                ORDER BY created_at DESC
+                LIMIT ?
+            ) ORDER BY created_at ASC
+            """, (limit,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading response cache: {str(e)}")
+            return []
+
+    def save_cached_response(self, cache_key: str, candidates: str, created_at: float) -> bool:
+        """حفظ مدخل في ذاكرة الردود المؤقتة"""
+        try:
+            with self.storage.write() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (cache_key, candidates, created_at) VALUES (?, ?, ?)",
+                    (cache_key, candidates, created_at)
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving cached response: {str(e)}")
+            return False
+
+    def delete_cached_response(self, cache_key: str) -> bool:
+        """حذف مدخل من ذاكرة الردود المؤقتة"""
+        try:
+            with self.storage.write() as conn:
+                conn.execute("DELETE FROM response_cache WHERE cache_key = ?", (cache_key,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error deleting cached response: {str(e)}")
+            return False
+
+    def get_conversation_history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """استرجاع سجل المحادثات (الأحدث أولاً)"""
+        return self.get_conversation_page(limit)[0]
+
+    def get_conversation_page(self, limit: int = 50, before: Optional[Tuple[str, int]] = None
+                              ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """
+        صفحة من سجل المحادثات بالمؤشر (timestamp, id) تنازلياً: كل صفحة بحث واحد
+        في الفهرس المركب بدل تخطي الصفوف السابقة بـ OFFSET.
+
+        Returns:
+            tuple: (الصفوف، مؤشر الصفحة التالية أو None عند نهاية السجل).
+        """
+        try:
+            if before is None:
+                # الصفحة الأولى تشمل آخر ما سُجل في طابور الكتابة
+                self.write_behind.flush()
+                condition, params = "", ()
+            else:
+                condition, params = "WHERE (timestamp, id) < (?, ?)", tuple(before)
+            cursor = self.conn.execute(f"""
+            SELECT id, user_input, ai_response, timestamp
+            FROM interactions
+            {condition}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+            """, params + (limit + 1,))
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if len(rows) <= limit:
+                return rows, None
+            rows = rows[:limit]
+            return rows, (rows[-1]["timestamp"], rows[-1]["id"])
+        except sqlite3.Error as e:
+            print(f"Error fetching conversation history: {str(e)}")
+            return [], None
+
+    def iter_interactions(self, start: Optional[str] = None, end: Optional[str] = None,
+                          columns: str = "user_input, ai_response, timestamp") -> Iterator[tuple]:
+        """كل التفاعلات في المدى الزمني [start, end) عبر الأرشيف والقاعدة الحالية (للتحليلات)"""
+        self.write_behind.flush()
+        return self.archive.query("interactions", columns, start=start, end=end)
+
+    def get_learning_stats(self) -> Dict[str, Any]:
+        """الحصول على إحصائيات التعلم (من العدادات المحدثة بال triggers)"""
+        stats = {
+            "total_interactions": 0,
+            "valuable_interactions": 0,
+            "top_patterns": [],
+            "total_items": 0,
+            "last_updated": "غير متاح",
+            "accuracy": "0%"
+        }
+        
+        try:
+            self.write_behind.flush()
+            cursor = self.conn.cursor()
+            
+            # العدادات الكلية: صف واحد مهما كان حجم السجل
+            cursor.execute("""
+            SELECT interactions, valuable_interactions, confidence_sum, knowledge_items
+            FROM learning_stats WHERE id = 1
+            """)
+            row = cursor.fetchone()
+            if row is not None:
+                total, valuable, confidence_sum, knowledge_items = row
+                stats["total_interactions"] = total
+                stats["valuable_interactions"] = valuable
+                stats["total_items"] = knowledge_items
+                # متوسط ثقة الردود
+                stats["accuracy"] = f"{(confidence_sum / total if total else 0) * 100:.0f}%"
+            
+            # آخر تحديث للمعرفة (من طرف الفهرس)
+            cursor.execute("SELECT MAX(last_updated) FROM knowledge_base")
+            last_updated = cursor.fetchone()[0]
+            if last_updated:
+                stats["last_updated"] = last_updated
+            
+            # الأنماط الأكثر استخداماً
+            cursor.execute("""
+            SELECT pattern_name, count 
+            FROM learning_patterns 
+            ORDER BY count DESC 
+            LIMIT 3
+            """)
+            stats["top_patterns"] = [{"name": row[0], "count": row[1]} for row in cursor.fetchall()]
+            
+        except sqlite3.Error as e:
+            print(f"Error getting learning stats: {str(e)}")
+        
+        return stats
+
+    def get_daily_stats(self, days: int = 30) -> List[Dict[str, Any]]:
+        """تجميع التفاعلات لكل يوم (الأحدث أولاً)"""
+        try:
+            self.write_behind.flush()
+            cursor = self.conn.execute("""
+            SELECT day, interactions, valuable_interactions, confidence_sum
+            FROM daily_stats
+            ORDER BY day DESC
+            LIMIT ?
+            """, (days,))
+            return [
+                {
+                    "day": day, "interactions": total, "valuable_interactions": valuable,
+                    "average_confidence": confidence_sum / total if total else 0.0
+                }
+                for day, total, valuable, confidence_sum in cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            print(f"Error getting daily stats: {str(e)}")
+            return []
+
+    def get_pattern_stats(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """عدد التفاعلات لكل نمط مكتشف (الأكثر أولاً)"""
+        try:
+            self.write_behind.flush()
+            cursor = self.conn.execute("""
+            SELECT pattern, interactions FROM pattern_stats
+            WHERE interactions > 0
+            ORDER BY interactions DESC
+            LIMIT ?
+            """, (limit,))
+            return [{"name": name, "count": count} for name, count in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error getting pattern stats: {str(e)}")
+            return []
+
+    def close(self) -> None:
+        """إغلاق قاعدة البيانات بشكل آمن (الاتصالات مشتركة وتبقى لباقي المستخدمين)"""
+        try:
+            # تثبيت الكتابات المؤجلة قبل الإغلاق
+            if getattr(self, "write_behind", None) is not None:
+                self.write_behind.flush(timeout=5)
+        except sqlite3.Error as e:
+            print(f"Error closing database: {str(e)}")
+
+    def __del__(self):
+        """تنظيف الموارد عند الحذف"""
+        self.close()
+
+    def backup_database(self, backup_path: str,
+                        progress: Optional[Callable[[float], None]] = None) -> bool:
+        """نسخة احتياطية على اتصال مستقل بخطوات صغيرة، دون إيقاف الكتابة أثناء النسخ"""
+        return BackupJob(self.storage.db_path, backup_path, progress=progress).run()
+
+    def schedule_backups(self, directory: str = BACKUP_DIR,
+                         interval: float = 24 * 3600) -> BackupScheduler:
+        """لقطات تزايدية دورية تكتب الكتل المتغيرة فقط"""
+        return schedule_backups(self.storage.db_path, directory, interval)
+    
+    # ------------------------ قاعدة المعرفة ------------------------
+    def add_knowledge(self, topic: str, details: str, confidence: float = 0.7,
+                      category: str = "عام") -> Optional[int]:
+        """إضافة مفهوم أو تحديث تفاصيله إذا كان موجوداً"""
+        try:
+            with self.storage.write() as conn:
+                conn.execute("""
+                INSERT INTO knowledge_base (category, concept, details, confidence)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(concept) DO UPDATE SET
+                    details = excluded.details,
+                    confidence = MAX(confidence, excluded.confidence),
+                    last_updated = CURRENT_TIMESTAMP
+                """, (category, topic, details, confidence))
+                return conn.execute("SELECT id FROM knowledge_base WHERE concept = ?", (topic,)).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error adding knowledge: {str(e)}")
+            return None
+
+    def add_knowledge_item(self, item: Dict[str, Any]) -> Optional[int]:
+        """إضافة عنصر معرفة من واجهة التعلم"""
+        item_id = self.add_knowledge(
+            item["concept"], item["details"], item.get("confidence", 0.7), item.get("category", "عام")
+        )
+        if item_id is not None:
+            item["id"] = item_id
+        return item_id
+
+    def update_knowledge_item(self, item: Dict[str, Any]) -> bool:
+        """حفظ تعديلات عنصر معرفة"""
+        try:
+            with self.storage.write() as conn:
+                conn.execute("""
+                UPDATE knowledge_base
+                SET category = ?, concept = ?, details = ?, last_updated = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """, (item["category"], item["concept"], item["details"], item["id"]))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error updating knowledge: {str(e)}")
+            return False
+
+    def get_knowledge_page(self, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                           category: Optional[str] = None
+                           ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """
+        صفحة من المعرفة مرتبة بـ (category, id) عبر المؤشر، اختيارياً لتصنيف واحد.
+
+        Returns:
+            tuple: (العناصر، مؤشر الصفحة التالية أو None عند النهاية).
+        """
+        conditions, params = [], []
+        if after is not None:
+            conditions.append("(category, id) > (?, ?)")
+            params.extend(after)
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            cursor = self.conn.execute(f"""
+            SELECT id, category, concept, details, last_updated
+            FROM knowledge_base
+            {where}
+            ORDER BY category, id
+            LIMIT ?
+            """, params + [limit + 1])
+            columns = [col[0] for col in cursor.description]
+            items = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if len(items) <= limit:
+                return items, None
+            items = items[:limit]
+            return items, (items[-1]["category"], items[-1]["id"])
+        except sqlite3.Error as e:
+            print(f"Error fetching knowledge: {str(e)}")
+            return [], None
+
+    def get_knowledge_item(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """عنصر معرفة واحد برقمه"""
+        try:
+            cursor = self.conn.execute("""
+            SELECT id, category, concept, details, last_updated
+            FROM knowledge_base WHERE id = ?
+            """, (item_id,))
+            row = cursor.fetchone()
+            return dict(zip([col[0] for col in cursor.description], row)) if row else None
+        except sqlite3.Error as e:
+            print(f"Error fetching knowledge: {str(e)}")
+            return None
+
+    def get_knowledge_categories(self) -> Dict[str, int]:
+        """عدد المفاهيم في كل تصنيف (من الفهرس دون قراءة التفاصيل)"""
+        try:
+            return dict(self.conn.execute(
+                "SELECT category, COUNT(*) FROM knowledge_base GROUP BY category ORDER BY category"
+            ).fetchall())
+        except sqlite3.Error as e:
+            print(f"Error fetching knowledge: {str(e)}")
+            return {}
+
+    def forget_knowledge(self, concept: str):
+        """حذف مفهوم من قاعدة المعرفة"""
+        query = "DELETE FROM knowledge_base WHERE concept = ?"
+        with self.storage.write() as conn:
+            conn.execute(query, (concept,))
\ No newline at end of file
@@ -0,0 +1,148 @@
+# ------------------------ واجهات التوليد القابلة للتبديل ------------------------
+from kv_cache import past_length
+import torch
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from optimum.onnxruntime import ORTModelForCausalLM
+except ImportError:  # ONNX Runtime اختياري
+    ORTModelForCausalLM = None
+
+
+ONNX_CACHE_DIR = os.path.join("ai_model", "onnx")
+
+
+class GenerationBackend:
+    """
+    واجهة خطوة التوليد: تمريرة أمامية واحدة تُرجع logits آخر موضع و past الجديد.
+    حلقة فك الترميز (البث، ذاكرة KV، معايير التوقف) مشتركة فوق هذه الواجهة.
+    """
+
+    name = "base"
+    supports_batch = False  # هل يدعم model.generate بدفعات مبطّنة
+
+    def forward(self, input_ids: torch.Tensor, past=None) -> Tuple[torch.Tensor, object]:
+        raise NotImplementedError
+
+
+class TorchBackend(GenerationBackend):
+    """التنفيذ الافتراضي عبر transformers + torch"""
+
+    name = "torch"
+    supports_batch = True
+
+    def __init__(self, model):
+        self.model = model
+
+    def forward(self, input_ids, past=None):
+        outputs = self.model(input_ids, past_key_values=past, use_cache=True)
+        return outputs.logits[:, -1, :], outputs.past_key_values
+
+
+class OnnxBackend(GenerationBackend):
+    """تنفيذ عبر ONNX Runtime برسم مُصدَّر يدعم past_key_values ومحفوظ على القرص"""
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, cache_dir: str = ONNX_CACHE_DIR):
+        if ORTModelForCausalLM is None:
+            raise ImportError("optimum[onnxruntime] غير مثبت")
+
+        export_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        if os.path.exists(os.path.join(export_dir, "config.json")):
+            self.model = ORTModelForCausalLM.from_pretrained(export_dir, use_cache=True)
+        else:
+            # التصدير يتم مرة واحدة ثم يُعاد استخدام الرسم المحفوظ
+            self.model = ORTModelForCausalLM.from_pretrained(model_name, export=True, use_cache=True)
+            self.model.save_pretrained(export_dir)
+
+    def forward(self, input_ids, past=None):
+        input_ids = input_ids.to("cpu")
+        attention_mask = torch.ones(
+            (input_ids.shape[0], past_length(past) + input_ids.shape[1]), dtype=torch.long
+        )
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            past_key_values=past,
+            use_cache=True
+        )
+        return outputs.logits[:, -1, :], outputs.past_key_values
+
+
+def _create_backend(name: str, handle) -> GenerationBackend:
+    if name == "torch":
+        return TorchBackend(handle.model)
+    if name == "onnx":
+        return OnnxBackend(handle.key[0])
+    raise ValueError(f"واجهة توليد غير معروفة: {name}")
+
+
+def available_backends(handle) -> List[str]:
+    """الواجهات المتاحة للنموذج الحالي"""
+    names = ["torch"]
+    model_name, dtype, device = handle.key
+    # الرسم المُصدَّر بدقة fp32 وعلى المعالج فقط
+    if ORTModelForCausalLM is not None and dtype == "float32" and device == "cpu":
+        names.append("onnx")
+    return names
+
+
+def weights_modified(handle) -> bool:
+    """هل تغيرت أوزان النموذج عن نسخة المصدر (تدريب، نقطة تحقق، أو محولات LoRA)"""
+    return handle.weights_version > 0 or handle.get_extra("lora_adapters") is not None
+
+
+def benchmark_backend(backend: GenerationBackend, prompt_ids: List[int],
+                      decode_steps: int = 8, repeats: int = 3) -> float:
+    """زمن (ثوانٍ) لترميز مطالبة ثابتة ثم عدة خطوات فك ترميز، أفضل قيمة من عدة تكرارات"""
+    best = float("inf")
+    with torch.no_grad():
+        backend.forward(torch.tensor([prompt_ids[:4]]))  # إحماء
+        for _ in range(repeats):
+            start = time.perf_counter()
+            logits, past = backend.forward(torch.tensor([prompt_ids]))
+            for _ in range(decode_steps):
+                next_token = torch.argmax(logits, dim=-1, keepdim=True)
+                logits, past = backend.forward(next_token, past)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def select_backend(handle, preferred: str = "auto") -> GenerationBackend:
+    """
+    اختيار واجهة التوليد. في الوضع auto تُقاس الواجهات المتاحة مرة واحدة لكل نموذج
+    على المعالج الحالي ويُختار الأسرع، والنتيجة مشتركة بين كل المستخدمين.
+    يُستدعى قبل كل توليد: الرسم المُصدَّر من أوزان المصدر لا يرى المحولات ولا نقاط
+    التحقق، فيعود auto إلى torch بمجرد أن تتغير الأوزان.
+    """
+    if preferred != "auto":
+        return handle.get_extra(f"backend:{preferred}", lambda: _create_backend(preferred, handle))
+
+    def choose():
+        names = available_backends(handle)
+        if weights_modified(handle):
+            names = ["torch"]
+        if len(names) == 1:
+            return handle.get_extra("backend:torch", lambda: _create_backend("torch", handle))
+
+        prompt_ids = handle.tokenizer.encode("ما هي مراحل تصميم مشروع سكني وكيف أتابع تنفيذه؟")
+        timings: Dict[str, float] = {}
+        for name in names:
+            try:
+                backend = handle.get_extra(f"backend:{name}", lambda: _create_backend(name, handle))
+                with handle.lock:
+                    timings[name] = benchmark_backend(backend, prompt_ids)
+            except Exception as e:
+                print(f"❌ تعذر تجهيز واجهة {name}: {str(e)}")
+
+        fastest = min(timings, key=timings.get) if timings else "torch"
+        print(f"✅ واجهة التوليد المختارة: {fastest} {timings}")
+        return handle.get_extra(f"backend:{fastest}", lambda: _create_backend(fastest, handle))
+
+    backend = handle.get_extra("backend:auto", choose)
+    if backend.name != "torch" and weights_modified(handle):
+        return handle.get_extra("backend:torch", lambda: _create_backend("torch", handle))
+    return backend
@@ -0,0 +1,291 @@
+# ------------------------ عامل الاستدلال بالدفعات الديناميكية ------------------------
+from concurrent.futures import Future
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Any
+import threading
+import queue
+import time
+
+
+class InferenceRequest:
+    """طلب توليد واحد في طابور العامل"""
+
+    def __init__(self, prompt: str, max_length: int, temperature: float,
+                 on_chunk: Optional[Callable[[str], None]] = None,
+                 assistant=None, use_context: bool = False, deadline: Optional[float] = None):
+        self.prompt = prompt
+        self.max_length = max_length
+        self.temperature = temperature
+        self.on_chunk = on_chunk
+        self.assistant = assistant
+        self.use_context = use_context
+        self.deadline = deadline
+        self.outcome: Dict[str, Any] = {}  # سبب توقف التوليد وعدد ال tokens
+        self.future: Future = Future()
+        self.future.outcome = self.outcome
+        self.enqueued_at = time.monotonic()
+
+    @property
+    def settings_key(self):
+        # لا يمكن دمج طلبين في نفس الدفعة إلا إذا تطابقت إعدادات التوليد
+        return (self.max_length, self.temperature, self.use_context)
+
+
+class TurnCommit:
+    """دور مكتمل يُضاف لسياق المحادثة بترتيبه بين طلبات الطابور"""
+
+    def __init__(self, assistant, message: str, response: str):
+        self.assistant = assistant
+        self.message = message
+        self.response = response
+        self.future: Future = Future()
+
+
+class InferenceWorker(threading.Thread):
+    """
+    خيط استدلال واحد يجمع الطلبات المتزامنة في دفعات مبطّنة (padded)
+    خلال نافذة زمنية قصيرة بدلاً من تشغيل generate منفصل لكل رسالة
+    """
+
+    def __init__(self, assistant, batch_window: float = 0.02, max_batch_size: int = 8):
+        super().__init__(name="InferenceWorker", daemon=True)
+        self.assistant = assistant
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Optional[InferenceRequest]]" = queue.Queue()
+        self._deferred: List[TurnCommit] = []  # دور وصل أثناء جمع دفعة ويُنفذ بعدها
+        self._running = True
+        self._busy = False
+        self._last_activity = time.monotonic()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "requests": 0,
+            "batches": 0,
+            "total_queue_wait": 0.0,
+            "max_queue_wait": 0.0,
+            "batch_sizes": Counter()
+        }
+
+    def submit(self, prompt: str, max_length: int = 150, temperature: float = 0.7,
+               on_chunk: Optional[Callable[[str], None]] = None,
+               assistant=None, use_context: bool = False,
+               deadline: Optional[float] = None) -> Future:
+        """
+        إضافة طلب للطابور وإرجاع Future بالرد النهائي بعد التنظيف.
+        
+        Args:
+            assistant: المساعد صاحب المحادثة (الافتراضي مساعد العامل).
+            use_context (bool): الرد ضمن سياق المحادثة؛ منفرداً يعيد استخدام ذاكرة KV
+                للبادئة، وفي دفعة يحمل كل صف بادئة محادثته كاملة.
+            deadline (float): وقت time.monotonic() الذي يُعاد عنده الرد الجزئي؛
+                تتوفر نتيجته في future.outcome["reason"].
+        """
+        request = InferenceRequest(prompt, max_length, temperature, on_chunk,
+                                   assistant or self.assistant, use_context, deadline)
+        self._last_activity = time.monotonic()
+        self._queue.put(request)
+        return request.future
+
+    def submit_turn(self, message: str, response: str, assistant=None) -> Future:
+        """
+        تسجيل دور مكتمل (رد سريع أو مخزن) في سياق المحادثة على خيط العامل،
+        بعد الطلبات التي سبقته في الطابور، فلا تُعدل ذاكرة KV من خيط آخر.
+        """
+        commit = TurnCommit(assistant or self.assistant, message, response)
+        self._queue.put(commit)
+        return commit.future
+
+    def idle_seconds(self) -> float:
+        """الثواني منذ آخر طلب أو آخر دفعة، وصفر إذا كان هناك عمل جارٍ أو منتظر"""
+        if self._busy or self._deferred or not self._queue.empty():
+            return 0.0
+        return time.monotonic() - self._last_activity
+
+    def stop(self) -> None:
+        """إيقاف العامل بعد إنهاء الطلبات الحالية"""
+        self._running = False
+        self._queue.put(None)
+
+    def run(self):
+        while self._running:
+            first = self._deferred.pop(0) if self._deferred else self._queue.get()
+            if first is None:
+                break
+            self._busy = True
+            try:
+                if isinstance(first, TurnCommit):
+                    self._commit_turn(first)
+                else:
+                    self._process(first)
+            finally:
+                self._busy = False
+                self._last_activity = time.monotonic()
+
+    def _process(self, first: InferenceRequest) -> None:
+        pending = self._collect_batch(first)
+
+        while pending:
+            # رسالة واحدة على الأكثر لكل محادثة في الجولة: الرسالة التالية في نفس
+            # المحادثة تؤجل للجولة التالية فترى الدور الذي قبلها في السياق
+            groups: Dict[Any, List[InferenceRequest]] = {}
+            deferred: List[InferenceRequest] = []
+            conversations = set()
+            for request in pending:
+                if request.use_context:
+                    if id(request.assistant) in conversations:
+                        deferred.append(request)
+                        continue
+                    conversations.add(id(request.assistant))
+                # تقسيم الطلبات حسب إعدادات النمط (max_length, temperature)
+                groups.setdefault(request.settings_key, []).append(request)
+
+            for requests in groups.values():
+                for start in range(0, len(requests), self.max_batch_size):
+                    self._run_batch(requests[start:start + self.max_batch_size])
+            pending = deferred
+
+    def _collect_batch(self, first: InferenceRequest) -> List[InferenceRequest]:
+        """جمع الطلبات التي تصل خلال نافذة الدفعة"""
+        pending = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._running = False
+                break
+            if isinstance(request, TurnCommit):
+                # الطلبات بعد الدور يجب أن ترى السياق بعد إضافته فتُجمع في دفعة لاحقة
+                self._deferred.append(request)
+                break
+            pending.append(request)
+        return pending
+
+    def _commit_turn(self, commit: TurnCommit) -> None:
+        try:
+            commit.assistant.commit_turn(commit.message, commit.response)
+            commit.future.set_result(None)
+        except Exception as e:
+            commit.future.set_exception(e)
+
+    def _run_batch(self, requests: List[InferenceRequest]) -> None:
+        started = time.monotonic()
+        self._record_metrics(requests, started)
+
+        # الطلبات التي انتهت مهلتها أثناء الانتظار لا تُولد أصلاً
+        live = []
+        for request in requests:
+            if request.deadline is not None and started >= request.deadline:
+                request.outcome.update(reason="deadline", tokens=0)
+                request.future.set_result("")
+            else:
+                live.append(request)
+        if not live:
+            return
+        requests = live
+
+        try:
+            if len(requests) == 1:
+                # طلب وحيد: نبث الرد إن طُلب ذلك
+                request = requests[0]
+                assistant = request.assistant
+                if request.on_chunk is not None or request.use_context:
+                    chunks = []
+                    for chunk in assistant.stream_response(
+                        request.prompt,
+                        max_length=request.max_length,
+                        temperature=request.temperature,
+                        use_context=request.use_context,
+                        deadline=request.deadline,
+                        outcome=request.outcome
+                    ):
+                        chunks.append(chunk)
+                        if request.on_chunk is not None:
+                            request.on_chunk(chunk)
+                    responses = [assistant.clean_output("".join(chunks), "")]
+                    if request.use_context and request.outcome.get("reason") != "deadline":
+                        assistant.commit_turn(request.prompt, responses[0])
+                else:
+                    responses = [assistant.generate_response(
+                        request.prompt,
+                        max_length=request.max_length,
+                        temperature=request.temperature,
+                        deadline=request.deadline,
+                        outcome=request.outcome
+                    )]
+            else:
+                use_context = requests[0].use_context
+                responses = requests[0].assistant.generate_batch(
+                    [r.prompt for r in requests],
+                    max_length=requests[0].max_length,
+                    temperature=requests[0].temperature,
+                    outcomes=[r.outcome for r in requests],
+                    contexts=[r.assistant for r in requests] if use_context else None,
+                    # كل صف بمهلته وبثه الخاص
+                    deadlines=[r.deadline for r in requests],
+                    on_chunks=[r.on_chunk for r in requests]
+                )
+                if use_context:
+                    # الأدوار تُسجل بترتيب وصول الرسائل بعد اكتمال الدفعة
+                    for request, response in zip(requests, responses):
+                        if request.outcome.get("reason") != "deadline":
+                            request.assistant.commit_turn(request.prompt, response)
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        for request, response in zip(requests, responses):
+            request.future.set_result(response)
+
+    def _record_metrics(self, requests: List[InferenceRequest], now: float) -> None:
+        with self._metrics_lock:
+            self._metrics["requests"] += len(requests)
+            self._metrics["batches"] += 1
+            self._metrics["batch_sizes"][len(requests)] += 1
+            for request in requests:
+                wait = now - request.enqueued_at
+                self._metrics["total_queue_wait"] += wait
+                self._metrics["max_queue_wait"] = max(self._metrics["max_queue_wait"], wait)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """مقاييس حجم الدفعات وزمن الانتظار في الطابور"""
+        with self._metrics_lock:
+            requests = self._metrics["requests"]
+            batches = self._metrics["batches"]
+            return {
+                "requests": requests,
+                "batches": batches,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": requests / batches if batches else 0.0,
+                "batch_size_histogram": dict(self._metrics["batch_sizes"]),
+                "avg_queue_wait_ms": 1000 * self._metrics["total_queue_wait"] / requests if requests else 0.0,
+                "max_queue_wait_ms": 1000 * self._metrics["max_queue_wait"]
+            }
+
+
+_shared_worker: Optional[InferenceWorker] = None
+_shared_lock = threading.Lock()
+
+
+def inference_idle_seconds() -> float:
+    """مدة خمول العامل المشترك (لا نهائية إذا لم يُنشأ بعد)"""
+    worker = _shared_worker
+    if worker is None or not worker.is_alive():
+        return float("inf")
+    return worker.idle_seconds()
+
+
+def get_inference_worker(assistant) -> InferenceWorker:
+    """العامل المشترك على مستوى العملية (يُنشأ عند أول استخدام)"""
+    global _shared_worker
+    with _shared_lock:
+        if _shared_worker is None or not _shared_worker.is_alive():
+            _shared_worker = InferenceWorker(assistant)
+            _shared_worker.start()
+        return _shared_worker
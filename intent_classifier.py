@@ -0,0 +1,202 @@
+# ------------------------ مصنف النوايا الخفيف (n-grams مجزأة + نموذج خطي) ------------------------
+from typing import Dict, List, Optional, Sequence, Tuple
+from archive import ArchiveManager
+import itertools
+import numpy as np
+import os
+import re
+import zlib
+
+
+INTENT_MODEL_PATH = os.path.join("ai_model", "intent_classifier.npz")
+
+
+class IntentClassifier:
+    """
+    مصنف متعدد التسميات (one-vs-rest logistic) على خصائص n-grams للأحرف والكلمات
+    مجزأة في متجه ثابت الحجم، بدون أي تمرير عبر النموذج اللغوي
+    """
+
+    def __init__(self, labels: Sequence[str] = (), n_features: int = 2 ** 14,
+                 char_ngrams: Tuple[int, int] = (2, 4)):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.char_ngrams = char_ngrams
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    # ------------------------ الخصائص ------------------------
+    def _tokens(self, text: str) -> List[str]:
+        words = re.findall(r'\w+', text.lower())
+        tokens = [f"w:{w}" for w in words]
+        tokens += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                tokens += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+        return tokens
+
+    def featurize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(مواضع الخصائص، قيمها بعد تطبيع L2) للنص"""
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for token in self._tokens(text)),
+            dtype=np.int64
+        ) % self.n_features
+        indices, counts = np.unique(hashes, return_counts=True)
+        values = counts.astype(np.float32)
+        norm = np.linalg.norm(values)
+        return indices, values / norm if norm else values
+
+    def _sparse_batch(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(الصف، الموضع، القيمة) لكل خاصية في الدفعة"""
+        rows, indices, values = [], [], []
+        for row, text in enumerate(texts):
+            idx, val = self.featurize(text)
+            rows.append(np.full(len(idx), row, dtype=np.int64))
+            indices.append(idx)
+            values.append(val)
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(indices), np.concatenate(values)
+
+    # ------------------------ التصنيف ------------------------
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        """درجات خطية بالشكل (عدد النصوص، عدد التسميات)"""
+        rows, indices, values = self._sparse_batch(texts)
+        scores = np.tile(self.bias, (len(texts), 1))
+        np.add.at(scores, rows, self.weights[indices] * values[:, None])
+        return scores
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+
+    def predict(self, texts: Sequence[str], threshold: float = 0.5) -> List[List[str]]:
+        """التسميات المتوقعة لكل نص في الدفعة"""
+        probabilities = self.predict_proba(texts)
+        return [
+            [self.labels[j] for j in np.flatnonzero(row >= threshold)]
+            for row in probabilities
+        ]
+
+    def has_label(self, text: str, label: str, threshold: float = 0.5) -> bool:
+        """هل ينتمي النص لتسمية معينة (False إذا كانت التسمية غير معروفة للنموذج)"""
+        if label not in self.labels:
+            return False
+        return bool(self.predict_proba([text])[0, self.labels.index(label)] >= threshold)
+
+    # ------------------------ التدريب ------------------------
+    def fit(self, texts: Sequence[str], targets: Sequence[Sequence[str]], epochs: int = 15,
+            learning_rate: float = 0.5, l2: float = 1e-4, batch_size: int = 256,
+            seed: int = 0) -> "IntentClassifier":
+        """تدريب بالانحدار التدرجي بدفعات صغيرة؛ التسميات تُستخرج من targets"""
+        self.labels = sorted({label for labels in targets for label in labels})
+        self.weights = np.zeros((self.n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        if not self.labels:
+            return self
+
+        positions = {label: j for j, label in enumerate(self.labels)}
+        y = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        for i, labels in enumerate(targets):
+            for label in labels:
+                y[i, positions[label]] = 1.0
+
+        # الخصائص تُحسب مرة واحدة لكل نص
+        features = [self.featurize(text) for text in texts]
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                rows = np.concatenate([np.full(len(features[i][0]), r) for r, i in enumerate(batch)])
+                indices = np.concatenate([features[i][0] for i in batch])
+                values = np.concatenate([features[i][1] for i in batch])
+
+                scores = np.tile(self.bias, (len(batch), 1))
+                np.add.at(scores, rows, self.weights[indices] * values[:, None])
+                error = 1.0 / (1.0 + np.exp(-scores)) - y[batch]
+
+                gradient = np.zeros_like(self.weights)
+                np.add.at(gradient, indices, values[:, None] * error[rows])
+                step = learning_rate / len(batch)
+                self.weights -= step * gradient + learning_rate * l2 * self.weights
+                self.bias -= step * error.sum(axis=0)
+        return self
+
+    # ------------------------ الحفظ والتحميل ------------------------
+    def save(self, path: str = INTENT_MODEL_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+            char_ngrams=np.array(self.char_ngrams)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> Optional["IntentClassifier"]:
+        """تحميل نموذج محفوظ، أو None إذا لم يُدرب بعد"""
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        classifier = cls(
+            labels=[str(label) for label in data["labels"]],
+            n_features=data["weights"].shape[0],
+            char_ngrams=tuple(int(n) for n in data["char_ngrams"])
+        )
+        classifier.weights = data["weights"]
+        classifier.bias = data["bias"]
+        return classifier
+
+
+def load_training_data(db_path: str = "ai_learning.db") -> Tuple[List[str], List[List[str]]]:
+    """
+    النصوص وتسمياتها من جدولي interactions و conversations عبر الأرشيف والقاعدة
+    الحالية معاً (النصوص بلا تسمية أمثلة سلبية)
+    """
+    archive = ArchiveManager(db_path)
+    rows = itertools.chain(
+        archive.query("interactions", "user_input, pattern_detected", ordered=False),
+        archive.query("conversations", "user_input, category", ordered=False)
+    )
+
+    texts, targets = [], []
+    for text, labels in rows:
+        if not text:
+            continue
+        texts.append(text)
+        targets.append([label.strip() for label in (labels or "").split(",") if label.strip()])
+    return texts, targets
+
+
+def train_from_database(db_path: str = "ai_learning.db",
+                        path: str = INTENT_MODEL_PATH) -> Optional[Dict[str, float]]:
+    """إعادة التدريب دون اتصال وحفظ النموذج، مع دقة التسميات على 20% محجوزة"""
+    texts, targets = load_training_data(db_path)
+    if not any(targets):
+        print("❌ لا توجد بيانات مُسماة للتدريب")
+        return None
+
+    split = int(len(texts) * 0.8) or len(texts)
+    order = np.random.default_rng(0).permutation(len(texts))
+    train, held_out = order[:split], order[split:]
+
+    classifier = IntentClassifier().fit([texts[i] for i in train], [targets[i] for i in train])
+    report = {"examples": len(texts), "labels": len(classifier.labels)}
+    if len(held_out):
+        predicted = classifier.predict([texts[i] for i in held_out])
+        exact = sum(set(p) == set(targets[i]) for p, i in zip(predicted, held_out))
+        report["held_out_accuracy"] = exact / len(held_out)
+
+    # النموذج النهائي يُدرب على كل البيانات
+    classifier.fit(texts, targets).save(path)
+    return report
+
+
+if __name__ == "__main__":
+    print(train_from_database())
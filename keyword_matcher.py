@@ -0,0 +1,72 @@
+# ------------------------ مطابقة كلمات الأنماط دفعة واحدة (Aho-Corasick) ------------------------
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+from arabic_text import normalize_arabic
+
+
+class KeywordMatcher:
+    """
+    آلة حالات مبنية مرة واحدة من كلمات كل الأنماط، تجد كل الأنماط المطابقة
+    في مرور خطي واحد على النص بدل فحص كل كلمة لكل نمط.
+    المطابقة على النص الموحد وبنفس معنى `kw in text` (أي موضع داخل النص).
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Iterable[str]]]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+        positions: Dict[str, int] = {}
+        for name, keywords in patterns:
+            index = positions.setdefault(name, len(self.patterns))
+            if index == len(self.patterns):
+                self.patterns.append(name)
+            for keyword in keywords:
+                keyword = normalize_arabic(keyword)
+                if keyword:
+                    self._add(keyword, index)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, index: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(index)
+
+    def _build_failure_links(self) -> None:
+        """روابط الفشل بالعرض أولاً، مع دمج مخرجات أطول لاحقة مطابقة"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+
+    def match(self, text: str) -> List[str]:
+        """الأنماط المطابقة للنص بترتيب إضافتها"""
+        found: Set[int] = set()
+        state = 0
+        for char in normalize_arabic(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found |= self._output[state]
+                if len(found) == len(self.patterns):
+                    break
+        return [self.patterns[i] for i in sorted(found)]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
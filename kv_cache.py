@@ -0,0 +1,103 @@
+# ------------------------ ذاكرة KV لبادئة المحادثة ------------------------
+from typing import Dict, List, Optional, Tuple
+
+
+def crop_past(past, length: int):
+    """قص past_key_values إلى أول length من ال tokens"""
+    if past is None or length <= 0:
+        return None
+    if hasattr(past, "crop"):
+        # DynamicCache في الإصدارات الحديثة من transformers
+        past.crop(length)
+        return past
+    return tuple(
+        tuple(t[:, :, :length, :] for t in layer)
+        for layer in past
+    )
+
+
+def past_length(past) -> int:
+    """عدد ال tokens المخزنة في past_key_values"""
+    if past is None:
+        return 0
+    if hasattr(past, "get_seq_length"):
+        return past.get_seq_length()
+    return past[0][0].shape[2]
+
+
+class PrefixKVCache:
+    """
+    يحتفظ ب past_key_values للجزء الذي تمت معالجته من المحادثة حتى لا يُعاد
+    ترميزه في كل دور، مع إخلاء أقدم الأدوار عند تجاوز نافذة ال tokens
+    """
+
+    def __init__(self, max_tokens: int = 512, evict_to: float = 0.5):
+        self.max_tokens = max_tokens
+        # عند التجاوز نحذف أدواراً حتى نصل لهذه النسبة لتجنب إعادة الترميز في كل دور تالٍ
+        self.evict_to = evict_to
+        self.turns: List[Tuple[List[int], List[int]]] = []  # (ids الرسالة، ids الرد)
+        self.token_ids: List[int] = []
+        self.past = None
+        self.weights_version = 0  # نسخة الأوزان التي حُسب بها past
+        self.stats: Dict[str, int] = {
+            "reused_tokens": 0,
+            "prefilled_tokens": 0,
+            "evicted_turns": 0
+        }
+
+    def add_turn(self, message_ids: List[int], response_ids: List[int]) -> None:
+        """إضافة دور مكتمل إلى المحادثة"""
+        self.turns.append((message_ids, response_ids))
+
+    def build_prompt(self, message_ids: List[int], separator: List[int]) -> List[int]:
+        """بناء ids المحادثة كاملة مع إخلاء الأدوار القديمة عند الحاجة"""
+        prompt = self._join(message_ids, separator)
+        if len(prompt) > self.max_tokens and self.turns:
+            target = int(self.max_tokens * self.evict_to)
+            while self.turns and len(prompt) > target:
+                self.turns.pop(0)
+                self.stats["evicted_turns"] += 1
+                prompt = self._join(message_ids, separator)
+        return prompt
+
+    def _join(self, message_ids: List[int], separator: List[int]) -> List[int]:
+        ids: List[int] = []
+        for turn_message, turn_response in self.turns:
+            ids += turn_message + separator + turn_response + separator
+        return ids + message_ids + separator
+
+    def reuse(self, prompt_ids: List[int], weights_version: int = 0):
+        """
+        إرجاع (عدد ال tokens المعاد استخدامها، past المقصوص) لأطول بادئة مشتركة.
+        يبقى token واحد على الأقل للمعالجة للحصول على logits الخطوة التالية.
+        لا يُعاد استخدام past إذا تغيرت الأوزان منذ حسابه.
+        """
+        if weights_version != self.weights_version:
+            self.past = None
+            self.token_ids = []
+        common = 0
+        limit = min(len(self.token_ids), len(prompt_ids) - 1)
+        while common < limit and self.token_ids[common] == prompt_ids[common]:
+            common += 1
+
+        past = crop_past(self.past, common) if common else None
+        self.past = None  # ال past أصبح ملكاً للمستدعي حتى يعيده store
+        self.token_ids = []
+
+        self.stats["reused_tokens"] += common
+        self.stats["prefilled_tokens"] += len(prompt_ids) - common
+        return common, past
+
+    def store(self, prompt_ids: List[int], past, weights_version: int = 0) -> None:
+        """حفظ past الخاص بالبادئة بعد قصه لإزالة ال tokens المولدة"""
+        self.weights_version = weights_version
+        # قد يكون past أقصر من البادئة إذا توقف التوليد قبل اكتمال الترميز
+        length = min(len(prompt_ids), past_length(past))
+        self.past = crop_past(past, length)
+        self.token_ids = list(prompt_ids[:length]) if self.past is not None else []
+
+    def reset(self) -> None:
+        """مسح المحادثة وذاكرة KV"""
+        self.turns = []
+        self.token_ids = []
+        self.past = None
@@ -0,0 +1,505 @@
+# ------------------------ ترحيلات مخطط قاعدة البيانات (PRAGMA user_version) ------------------------
+from typing import Callable, List
+import sqlite3
+import time
+
+
+# عدد الأمثلة المحفوظة لكل نمط
+PATTERN_EXAMPLES_KEPT = 5
+
+# أعمدة النص الموحد: (الجدول، العمود الأصلي، العمود الموحد)
+NORMALIZED_COLUMNS = [
+    ("common_questions", "question", "question_norm"),
+    ("knowledge_base", "concept", "concept_norm")
+]
+
+# فهارس البحث النصي: (الجدول المصدر، جدول الفهرس، الأعمدة المفهرسة)
+SEARCH_INDEXES = [
+    ("common_questions", "common_questions_fts", ("question", "answer")),
+    ("knowledge_base", "knowledge_fts", ("concept", "details"))
+]
+
+
+# ------------------------ أجزاء المخطط ------------------------
+def _create_pattern_examples(cursor) -> None:
+    """
+    أمثلة الأنماط كحلقة محدودة في جدول فرعي: إضافة مثال INSERT واحد،
+    و trigger يحذف ما زاد عن آخر PATTERN_EXAMPLES_KEPT مثال للنمط
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pattern_examples'")
+    exists = cursor.fetchone() is not None
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pattern_examples (
+        pattern_name TEXT NOT NULL
+            REFERENCES learning_patterns(pattern_name) ON DELETE CASCADE ON UPDATE CASCADE,
+        seq INTEGER NOT NULL,
+        example TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (pattern_name, seq)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS pattern_examples_prune AFTER INSERT ON pattern_examples BEGIN
+        DELETE FROM pattern_examples
+        WHERE pattern_name = new.pattern_name AND seq <= new.seq - {PATTERN_EXAMPLES_KEPT};
+    END
+    """)
+    if not exists:
+        # نقل الأمثلة المخزنة سابقاً كقائمة JSON في learning_patterns.example_questions
+        cursor.execute("""
+        INSERT OR IGNORE INTO pattern_examples (pattern_name, seq, example)
+        SELECT p.pattern_name, e.key + 1, e.value
+        FROM learning_patterns p,
+             json_each(CASE WHEN json_valid(p.example_questions) THEN p.example_questions ELSE '[]' END) e
+        """)
+        cursor.execute("UPDATE learning_patterns SET example_questions = NULL")
+
+
+def _create_normalized_columns(cursor) -> None:
+    """
+    أعمدة ظل بالنص الموحد (normalize_arabic) مع فهارس، تُملأ عبر triggers
+    فتبقى متزامنة مهما كان مصدر الكتابة
+    """
+    for table, source, column in NORMALIZED_COLUMNS:
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_{column}_ai AFTER INSERT ON {table} BEGIN
+            UPDATE {table} SET {column} = normalize_arabic(new.{source}) WHERE rowid = new.rowid;
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_{column}_au AFTER UPDATE OF {source} ON {table} BEGIN
+            UPDATE {table} SET {column} = normalize_arabic(new.{source}) WHERE rowid = new.rowid;
+        END
+        """)
+        # ملء الصفوف الموجودة قبل إضافة العمود
+        cursor.execute(f"UPDATE {table} SET {column} = normalize_arabic({source}) WHERE {column} IS NULL")
+
+    # كلمات الكشف مخزنة كقائمة في عمود واحد: جدول فرعي بكلمة موحدة لكل صف
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pattern_keywords'")
+    keywords_exist = cursor.fetchone() is not None
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pattern_keywords (
+        pattern_name TEXT NOT NULL,
+        keyword TEXT NOT NULL,
+        keyword_norm TEXT NOT NULL,
+        PRIMARY KEY (pattern_name, keyword)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pattern_keywords_norm ON pattern_keywords(keyword_norm)")
+    insert_keywords = """
+        INSERT OR IGNORE INTO pattern_keywords (pattern_name, keyword, keyword_norm)
+        SELECT new.pattern_name, value, normalize_arabic(value)
+        FROM json_each(split_keywords(new.detection_keywords));
+    """
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS learning_patterns_keywords_ai AFTER INSERT ON learning_patterns BEGIN
+        {insert_keywords}
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS learning_patterns_keywords_au
+    AFTER UPDATE OF pattern_name, detection_keywords ON learning_patterns BEGIN
+        DELETE FROM pattern_keywords WHERE pattern_name = old.pattern_name;
+        {insert_keywords}
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS learning_patterns_keywords_ad AFTER DELETE ON learning_patterns BEGIN
+        DELETE FROM pattern_keywords WHERE pattern_name = old.pattern_name;
+    END
+    """)
+    if not keywords_exist:
+        cursor.execute("""
+        INSERT OR IGNORE INTO pattern_keywords (pattern_name, keyword, keyword_norm)
+        SELECT p.pattern_name, k.value, normalize_arabic(k.value)
+        FROM learning_patterns p, json_each(split_keywords(p.detection_keywords)) k
+        """)
+
+    # إصدار كلمات الأنماط: يزداد مع كل تغيير فتعرف النسخ المخزنة من المطابق أنها قديمة
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS app_meta (
+        key TEXT PRIMARY KEY,
+        value
+    )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('patterns_version', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS pattern_keywords_version_{event.lower()}
+        AFTER {event} ON pattern_keywords BEGIN
+            UPDATE app_meta SET value = value + 1 WHERE key = 'patterns_version';
+        END
+        """)
+
+
+def _create_search_index(cursor) -> None:
+    """
+    فهارس FTS5 بدون محتوى (content='') على النص الموحد، تتزامن مع الجداول الأصلية
+    عبر triggers. تحديث عدادات الاستخدام لا يلمس الفهرس لأن triggers التحديث
+    مقيدة بالأعمدة النصية. أي جزء موجود (فهرس قديم على النص الخام أو بناء ناقص)
+    يُحذف ويُعاد بناء الفهرس كاملاً.
+    """
+    for table, fts, columns in SEARCH_INDEXES:
+        for suffix in ("_ai", "_ad", "_au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {fts}{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}_vocab")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"normalize_arabic(new.{c})" for c in columns)
+        old_cols = ", ".join(f"normalize_arabic(old.{c})" for c in columns)
+
+        cursor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='')")
+        cursor.execute(f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """)
+        # عدد المستندات لكل كلمة لاختيار الكلمات النادرة في الاستعلام
+        cursor.execute(f"CREATE VIRTUAL TABLE {fts}_vocab USING fts5vocab({fts}, 'row')")
+        # فهرسة الصفوف الموجودة قبل إنشاء الفهرس
+        fill_search_index(cursor, table, fts, columns)
+
+
+def ensure_search_index(storage) -> bool:
+    """
+    فهرس البحث النصي خطوة منفصلة عن الترحيلات المرقمة: يُفحص عند كل فتح، ويُبنى
+    كاملاً داخل SAVEPOINT أو لا يُبنى أبداً، فنسخة SQLite بدون FTS5 لا تترك
+    triggers ناقصة ويُعاد المحاولة عند الفتح التالي.
+
+    Returns:
+        bool: هل الفهرس متاح (وإلا يعود البحث إلى الأعمدة الموحدة).
+    """
+    if has_search_index(storage.reader()):
+        return True
+    with storage.write() as conn:
+        if has_search_index(conn):
+            return True
+        conn.execute("SAVEPOINT search_index")
+        try:
+            _create_search_index(conn.cursor())
+        except sqlite3.OperationalError as e:
+            conn.execute("ROLLBACK TO search_index")
+            conn.execute("RELEASE search_index")
+            print(f"تعذر إنشاء فهرس البحث النصي: {str(e)}")
+            return False
+        conn.execute("RELEASE search_index")
+    return True
+
+
+def fill_search_index(cursor, table: str, fts: str, columns: tuple) -> None:
+    """فهرسة كل صفوف الجدول بالنص الموحد"""
+    cols = ", ".join(columns)
+    normalized = ", ".join(f"normalize_arabic({c})" for c in columns)
+    cursor.execute(f"INSERT INTO {fts}(rowid, {cols}) SELECT id, {normalized} FROM {table}")
+
+
+# ------------------------ الترحيلات ------------------------
+def _v1_baseline(cursor) -> None:
+    """
+    المخطط الكامل حتى بدء الترقيم. كل الخطوات تتحقق من الموجود، فيصلح لملف جديد
+    ولملفات المستخدمين القديمة (user_version = 0) على حد سواء
+    """
+    # جدول المعلومات الشخصية (جديد)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS personal_info (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # جدول الأسئلة الشائعة (جديد)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS common_questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT UNIQUE NOT NULL,
+        answer TEXT NOT NULL,
+        usage_count INTEGER DEFAULT 1,
+        last_used DATETIME DEFAULT CURRENT_TIMESTAMP,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS conversations (
+        id INTEGER PRIMARY KEY,
+        user_input TEXT,
+        ai_response TEXT,
+        category TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # ----- إضافة الفهارس هنا -----
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON conversations (category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON conversations (timestamp)")
+    # ----------------------------
+
+    # جدول التفاعلات الأساسية (معدل)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_input TEXT NOT NULL,
+        ai_response TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        is_valuable BOOLEAN DEFAULT 0,
+        pattern_detected TEXT,
+        sentiment TEXT,
+        confidence REAL DEFAULT 0.5
+    )
+    """)
+
+    # جدول أنماط التعلم (معدل)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS learning_patterns (
+        pattern_name TEXT PRIMARY KEY,
+        detection_keywords TEXT NOT NULL,
+        example_questions TEXT,
+        count INTEGER DEFAULT 1,
+        last_used DATETIME,
+        response_style TEXT
+    )
+    """)
+    _create_pattern_examples(cursor)
+
+    # جدول التحسينات (معدل)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS improvements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        interaction_id INTEGER NOT NULL,
+        improvement_type TEXT NOT NULL,
+        details TEXT,
+        improvement_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (interaction_id) REFERENCES interactions(id) ON DELETE CASCADE
+    )
+    """)
+
+    # جدول ذاكرة الردود المؤقتة
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS response_cache (
+        cache_key TEXT PRIMARY KEY,
+        candidates TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """)
+
+    # جدول قاعدة المعرفة
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS knowledge_base (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT DEFAULT 'عام',
+        concept TEXT UNIQUE NOT NULL,
+        details TEXT NOT NULL,
+        confidence REAL DEFAULT 0.7,
+        usage_count INTEGER DEFAULT 0,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # إنشاء فهارس لتحسين الأداء
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_patterns_count ON learning_patterns(count)")
+
+    _create_normalized_columns(cursor)
+
+    # حالة خيط الكتابة المؤجلة (آخر عملية مثبتة من السجل)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS write_behind_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_seq INTEGER NOT NULL
+    )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO write_behind_state (id, last_seq) VALUES (1, 0)")
+
+
+def _stats_statements(row: str, sign: str) -> str:
+    """عبارات إضافة (+) أو طرح (-) صف من التفاعلات في كل العدادات"""
+    return f"""
+        UPDATE learning_stats SET
+            interactions = interactions {sign} 1,
+            valuable_interactions = valuable_interactions {sign} ({row}.is_valuable = 1),
+            confidence_sum = confidence_sum {sign} COALESCE({row}.confidence, 0)
+        WHERE id = 1;
+        INSERT INTO daily_stats (day, interactions, valuable_interactions, confidence_sum)
+        VALUES (date({row}.timestamp), {sign}1, {sign}({row}.is_valuable = 1), {sign}COALESCE({row}.confidence, 0))
+        ON CONFLICT(day) DO UPDATE SET
+            interactions = interactions + excluded.interactions,
+            valuable_interactions = valuable_interactions + excluded.valuable_interactions,
+            confidence_sum = confidence_sum + excluded.confidence_sum;
+        INSERT INTO pattern_stats (pattern, interactions)
+        SELECT {row}.pattern_detected, {sign}1 WHERE {row}.pattern_detected IS NOT NULL
+        ON CONFLICT(pattern) DO UPDATE SET interactions = interactions + excluded.interactions;
+    """
+
+
+def _v2_learning_stats(cursor) -> None:
+    """
+    عدادات إحصائيات التعلم محفوظة في جداول تحدثها triggers مع كل إضافة أو تعديل
+    أو حذف، فتُقرأ بصف واحد بدل COUNT(*) على كل السجل
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS learning_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        interactions INTEGER NOT NULL DEFAULT 0,
+        valuable_interactions INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        knowledge_items INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    # تجميع يومي ولكل نمط مكتشف
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS daily_stats (
+        day TEXT PRIMARY KEY,
+        interactions INTEGER NOT NULL DEFAULT 0,
+        valuable_interactions INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pattern_stats (
+        pattern TEXT PRIMARY KEY,
+        interactions INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pattern_stats_interactions ON pattern_stats(interactions)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_knowledge_last_updated ON knowledge_base(last_updated)")
+
+    # القيم الحالية من السجل الموجود (مرة واحدة عند الترحيل)
+    cursor.execute("""
+    INSERT OR REPLACE INTO learning_stats (id, interactions, valuable_interactions, confidence_sum, knowledge_items)
+    SELECT 1, COUNT(*), COALESCE(SUM(is_valuable = 1), 0), COALESCE(SUM(confidence), 0),
+           (SELECT COUNT(*) FROM knowledge_base)
+    FROM interactions
+    """)
+    cursor.execute("DELETE FROM daily_stats")
+    cursor.execute("""
+    INSERT INTO daily_stats (day, interactions, valuable_interactions, confidence_sum)
+    SELECT date(timestamp), COUNT(*), SUM(is_valuable = 1), COALESCE(SUM(confidence), 0)
+    FROM interactions GROUP BY date(timestamp)
+    """)
+    cursor.execute("DELETE FROM pattern_stats")
+    cursor.execute("""
+    INSERT INTO pattern_stats (pattern, interactions)
+    SELECT pattern_detected, COUNT(*) FROM interactions
+    WHERE pattern_detected IS NOT NULL GROUP BY pattern_detected
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS interactions_stats_ai AFTER INSERT ON interactions BEGIN
+        {_stats_statements("new", "+")}
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS interactions_stats_ad AFTER DELETE ON interactions BEGIN
+        {_stats_statements("old", "-")}
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS interactions_stats_au
+    AFTER UPDATE OF is_valuable, confidence, pattern_detected, timestamp ON interactions BEGIN
+        {_stats_statements("old", "-")}
+        {_stats_statements("new", "+")}
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS knowledge_stats_ai AFTER INSERT ON knowledge_base BEGIN
+        UPDATE learning_stats SET knowledge_items = knowledge_items + 1 WHERE id = 1;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS knowledge_stats_ad AFTER DELETE ON knowledge_base BEGIN
+        UPDATE learning_stats SET knowledge_items = knowledge_items - 1 WHERE id = 1;
+    END
+    """)
+
+
+def _v3_archive_flag(cursor) -> None:
+    """
+    نقل التفاعلات القديمة للأرشيف لا يُنقص إحصائيات التعلم: الحذف أثناء الأرشفة
+    (app_meta.archiving = 1 داخل نفس المعاملة) لا يمر على trigger الطرح
+    """
+    cursor.execute("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('archiving', 0)")
+    cursor.execute("DROP TRIGGER IF EXISTS interactions_stats_ad")
+    cursor.execute(f"""
+    CREATE TRIGGER interactions_stats_ad AFTER DELETE ON interactions
+    WHEN (SELECT value FROM app_meta WHERE key = 'archiving') IS NOT 1 BEGIN
+        {_stats_statements("old", "-")}
+    END
+    """)
+
+
+def _v4_keyset_indexes(cursor) -> None:
+    """
+    فهارس مركبة للتصفح بالمؤشر: (timestamp, id) للسجل و(category, id) للمعرفة،
+    فتكلفة أي صفحة بحث واحد في الفهرس مهما بعدت
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_timestamp_id ON interactions(timestamp, id)")
+    cursor.execute("DROP INDEX IF EXISTS idx_interactions_timestamp")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_knowledge_category_id ON knowledge_base(category, id)")
+
+
+# الترحيل رقم i يرفع user_version إلى i + 1؛ تُضاف الترحيلات الجديدة في النهاية فقط
+MIGRATIONS: List[Callable] = [
+    _v1_baseline,
+    _v2_learning_stats,
+    _v3_archive_flag,
+    _v4_keyset_indexes
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(storage) -> int:
+    """
+    تطبيق الترحيلات المعلقة في معاملة واحدة. إذا كان الملف محدثاً تكفي قراءة
+    user_version ولا تُنفذ أي DDL. فهرس البحث النصي يُفحص بعدها في خطوته الخاصة.
+
+    Returns:
+        int: عدد الترحيلات المطبقة.
+    """
+    if storage.reader().execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        ensure_search_index(storage)
+        return 0
+    started = time.perf_counter()
+    with storage.write() as conn:
+        # قد يكون خيط آخر أنهى الترحيل بين القراءة وحجز الكاتب
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        cursor = conn.cursor()
+        for migration in MIGRATIONS[current:]:
+            migration(cursor)
+        # user_version جزء من ترويسة الملف فيُثبت أو يُلغى مع المعاملة
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    ensure_search_index(storage)
+    applied = max(0, SCHEMA_VERSION - current)
+    if applied:
+        print(f"✅ ترحيل قاعدة البيانات إلى الإصدار {SCHEMA_VERSION} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return applied
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    """هل فهارس FTS5 مكتملة: الجداول بدون محتوى والجداول المساعدة وال triggers كلها"""
+    expected = []
+    for _, fts, _ in SEARCH_INDEXES:
+        expected += [fts, f"{fts}_vocab", f"{fts}_ai", f"{fts}_ad", f"{fts}_au"]
+    schema = dict(conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE name IN ({', '.join('?' * len(expected))})", expected
+    ).fetchall())
+    return all(name in schema for name in expected) and all(
+        "content=''" in schema[fts] for _, fts, _ in SEARCH_INDEXES
+    )
@@ -0,0 +1,218 @@
+from transformers import GPT2LMHeadModel, GPT2Tokenizer
+import torch
+import threading
+from typing import Dict, List, Optional, Tuple, Any
+
+
+# ------------------------ سجل النماذج المشترك ------------------------
+class _ModelEntry:
+    """نسخة واحدة من النموذج وال tokenizer مشتركة بين كل المستخدمين"""
+
+    def __init__(self, key: Tuple[str, str, str], tokenizer, model):
+        self.key = key
+        self.tokenizer = tokenizer
+        self.model = model
+        self.lock = threading.RLock()  # لحماية التمرير الأمامي/التدريب على نفس الأوزان
+        self.handles: Dict[int, str] = {}  # رقم المقبض -> اسم المستهلك
+        self.extras: Dict[str, Any] = {}  # موارد إضافية مشتقة من النموذج (مشتركة أيضاً)
+        self.weights_version = 0  # يزيد عند كل تعديل للأوزان (تدريب أو تبديل نقطة تحقق)
+        self.memory_bytes = _model_memory_bytes(model)
+
+    @property
+    def ref_count(self) -> int:
+        return len(self.handles)
+
+
+class ModelHandle:
+    """مقبض بعدّاد مراجع يمنح المستهلك الوصول للنموذج المشترك"""
+
+    def __init__(self, registry: "ModelRegistry", entry: _ModelEntry, owner: str, handle_id: int):
+        self._registry = registry
+        self._id = handle_id
+        self._entry = entry
+        self.owner = owner
+        self.released = False
+
+    @property
+    def model(self):
+        return self._entry.model
+
+    @property
+    def tokenizer(self):
+        return self._entry.tokenizer
+
+    @property
+    def lock(self):
+        return self._entry.lock
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self._entry.key
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device(self._entry.key[2])
+
+    @property
+    def weights_version(self) -> int:
+        return self._entry.weights_version
+
+    def bump_weights_version(self) -> int:
+        """تسجيل تغير الأوزان حتى تُهمل ذاكرات KV المحسوبة بالأوزان القديمة"""
+        with self._entry.lock:
+            self._entry.weights_version += 1
+            return self._entry.weights_version
+
+    def get_extra(self, name: str, factory=None):
+        """استرجاع مورد مشترك مرتبط بالنموذج وإنشاؤه مرة واحدة عند الحاجة"""
+        with self._entry.lock:
+            if name not in self._entry.extras and factory is not None:
+                self._entry.extras[name] = factory()
+            return self._entry.extras.get(name)
+
+    def set_extra(self, name: str, value) -> None:
+        """استبدال مورد مشترك مرتبط بالنموذج"""
+        with self._entry.lock:
+            self._entry.extras[name] = value
+
+    def memory_bytes(self) -> int:
+        """حصة هذا المقبض من ذاكرة النموذج المشترك"""
+        if self.released:
+            return 0
+        return self._entry.memory_bytes // max(self._entry.ref_count, 1)
+
+    def release(self) -> None:
+        """تحرير المقبض (يُحذف النموذج عند تحرير آخر مقبض)"""
+        if not self.released:
+            self._registry._release(self)
+            self.released = True
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+def _model_memory_bytes(model) -> int:
+    """حساب حجم الأوزان والمخازن المؤقتة للنموذج بالبايت"""
+    total = 0
+    seen = set()
+
+    def add(value):
+        nonlocal total
+        if isinstance(value, (tuple, list)):
+            # الطبقات المكممة تخزن أوزانها المضغوطة داخل tuple
+            for item in value:
+                add(item)
+        elif isinstance(value, torch.Tensor):
+            # الأوزان المربوطة (مثل wte و lm_head) تُحسب مرة واحدة
+            if value.data_ptr() in seen:
+                return
+            seen.add(value.data_ptr())
+            total += value.numel() * value.element_size()
+
+    for value in model.state_dict(keep_vars=True).values():
+        add(value)
+    return total
+
+
+def _resolve_device(device: Optional[str]) -> str:
+    if device is None:
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    return str(torch.device(device))
+
+
+class ModelRegistry:
+    """
+    سجل على مستوى العملية يملك نسخة واحدة من كل نموذج لكل
+    (الاسم، نوع البيانات، الجهاز) ويوزع مقابض بعدّاد مراجع
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, str], _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._loading: Dict[Tuple[str, str, str], threading.Event] = {}
+        self._next_handle_id = 0
+
+    def acquire(self, model_name: str = "aubmindlab/aragpt2-base",
+                dtype: str = "float32", device: Optional[str] = None,
+                owner: str = "unknown") -> ModelHandle:
+        """الحصول على مقبض للنموذج مع تحميله مرة واحدة فقط"""
+        if dtype == "qint8":
+            device = "cpu"
+        key = (model_name, dtype, _resolve_device(device))
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return self._new_handle(entry, owner)
+                pending = self._loading.get(key)
+                if pending is None:
+                    # هذا الخيط هو المسؤول عن التحميل
+                    pending = threading.Event()
+                    self._loading[key] = pending
+                    break
+            # خيط آخر يحمل النموذج نفسه، ننتظره بدلاً من التحميل مرتين
+            pending.wait()
+
+        try:
+            tokenizer, model = self._load(key)
+            entry = _ModelEntry(key, tokenizer, model)
+            with self._lock:
+                self._entries[key] = entry
+                return self._new_handle(entry, owner)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
+
+    def _new_handle(self, entry: _ModelEntry, owner: str) -> ModelHandle:
+        handle = ModelHandle(self, entry, owner, self._next_handle_id)
+        entry.handles[handle._id] = owner
+        self._next_handle_id += 1
+        return handle
+
+    def _load(self, key: Tuple[str, str, str]):
+        """تحميل ال tokenizer والنموذج من المصدر"""
+        model_name, dtype, device = key
+        tokenizer = GPT2Tokenizer.from_pretrained(model_name)
+        if dtype == "qint8":
+            # التكميم الديناميكي مدعوم على المعالج فقط، والنسخة المكممة محفوظة على القرص
+            from quantization import load_quantized
+            return tokenizer, load_quantized(model_name)
+        model = GPT2LMHeadModel.from_pretrained(model_name, torch_dtype=getattr(torch, dtype))
+        model.to(torch.device(device))
+        model.eval()
+        return tokenizer, model
+
+    def _release(self, handle: ModelHandle) -> None:
+        with self._lock:
+            entry = handle._entry
+            entry.handles.pop(handle._id, None)
+            if entry.ref_count == 0 and self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """تقرير استهلاك الذاكرة لكل نموذج ولكل مقبض"""
+        with self._lock:
+            report = []
+            for key, entry in self._entries.items():
+                share = entry.memory_bytes // max(entry.ref_count, 1)
+                report.append({
+                    "model_name": key[0],
+                    "dtype": key[1],
+                    "device": key[2],
+                    "ref_count": entry.ref_count,
+                    "memory_bytes": entry.memory_bytes,
+                    "handles": [
+                        {"owner": owner, "memory_bytes": share}
+                        for owner in entry.handles.values()
+                    ]
+                })
+            return report
+
+
+# سجل واحد مشترك على مستوى العملية
+registry = ModelRegistry()
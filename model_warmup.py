@@ -0,0 +1,45 @@
+# ------------------------ تحميل النماذج وتسخينها في الخلفية ------------------------
+from PyQt5.QtCore import QObject, pyqtSignal
+import threading
+
+
+class ModelWarmup(QObject):
+    """
+    تحميل النموذج اللغوي ونموذج الصوت في خيط خلفي بعد ظهور النافذة،
+    ثم تشغيل توليد قصير لتسخين الأنوية قبل أول رسالة حقيقية
+    """
+
+    progress = pyqtSignal(int, str)  # النسبة، وصف المرحلة
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, assistant, preload_voice: bool = True):
+        super().__init__()
+        self.assistant = assistant
+        self.preload_voice = preload_voice
+
+    def start(self):
+        threading.Thread(target=self._run, name="ModelWarmup", daemon=True).start()
+
+    def _run(self):
+        try:
+            self.progress.emit(5, "جاري تحميل النموذج اللغوي")
+            self.assistant.load()
+
+            self.progress.emit(70, "جاري تسخين النموذج")
+            self.assistant.generate_response("مرحبا", max_new_tokens=2)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        if self.preload_voice:
+            self.progress.emit(85, "جاري تحميل نموذج التعرف الصوتي")
+            try:
+                from voice_handler import load_vosk_model
+                load_vosk_model()
+            except Exception as e:
+                # فشل نموذج الصوت لا يمنع المحادثة النصية
+                print(f"❌ تعذر تحميل نموذج الصوت: {str(e)}")
+
+        self.progress.emit(100, "النموذج جاهز")
+        self.ready.emit()
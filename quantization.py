@@ -0,0 +1,164 @@
+# ------------------------ التكميم الديناميكي INT8 للاستدلال على المعالج ------------------------
+from transformers import GPT2LMHeadModel, GPT2Tokenizer
+from transformers.pytorch_utils import Conv1D
+import torch
+import torch.nn as nn
+import io
+import os
+import time
+from typing import Dict, List, Optional
+
+
+QUANTIZED_CACHE_DIR = os.path.join("ai_model", "quantized")
+
+# مجموعة ثابتة من المطالبات العربية لمقارنة النموذجين
+ARABIC_PROMPTS = [
+    "ما هي مراحل تصميم مشروع سكني؟",
+    "كيف أحسب تكلفة البناء للمتر المربع؟",
+    "اكتب جدولاً زمنياً لتنفيذ فيلا من طابقين",
+    "ما الفرق بين الخرسانة المسلحة والخرسانة العادية؟",
+    "كيف أنظم اجتماعاً مع المقاول لمتابعة المشروع؟",
+    "ما هي أهم اشتراطات العزل الحراري في المباني؟"
+]
+
+
+def conv1d_to_linear(model: nn.Module) -> nn.Module:
+    """
+    استبدال طبقات Conv1D الخاصة ب GPT-2 بطبقات nn.Linear مكافئة،
+    لأن التكميم الديناميكي في torch يعمل على nn.Linear فقط
+    """
+    for name, module in list(model.named_children()):
+        if isinstance(module, Conv1D):
+            in_features, out_features = module.weight.shape
+            linear = nn.Linear(in_features, out_features)
+            linear.weight.data = module.weight.data.t().contiguous()
+            linear.bias.data = module.bias.data
+            setattr(model, name, linear)
+        else:
+            conv1d_to_linear(module)
+    return model
+
+
+def quantize_dynamic_int8(model: nn.Module) -> nn.Module:
+    """تكميم أوزان طبقات Linear إلى int8 (التفعيلات تُكمم ديناميكياً أثناء التشغيل)"""
+    model = conv1d_to_linear(model.to("cpu").eval())
+    return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_cache_path(model_name: str, cache_dir: str = QUANTIZED_CACHE_DIR) -> str:
+    """مسار النموذج المكمم على القرص (مرتبط بإصدار torch لأن الصيغة قد تتغير)"""
+    safe_name = model_name.replace("/", "__")
+    return os.path.join(cache_dir, f"{safe_name}-qint8-torch{torch.__version__}.pt")
+
+
+def load_quantized(model_name: str, cache_dir: str = QUANTIZED_CACHE_DIR) -> nn.Module:
+    """تحميل النموذج المكمم من القرص، أو تكميمه وحفظه عند أول تشغيل"""
+    path = quantized_cache_path(model_name, cache_dir)
+    if os.path.exists(path):
+        try:
+            model = torch.load(path, map_location="cpu", weights_only=False)
+            model.eval()
+            return model
+        except Exception as e:
+            print(f"❌ تعذر تحميل النموذج المكمم، سيتم إعادة التكميم: {str(e)}")
+
+    model = quantize_dynamic_int8(GPT2LMHeadModel.from_pretrained(model_name))
+    model.eval()
+
+    # الكتابة في ملف مؤقت ثم إعادة التسمية حتى لا يبقى ملف تالف عند الانقطاع
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.save(model, tmp_path)
+    os.replace(tmp_path, path)
+    return model
+
+
+def serialized_size(model: nn.Module) -> int:
+    """حجم أوزان النموذج بعد التسلسل (يشمل الأوزان المكممة المضغوطة)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def _perplexity(model, tokenizer, texts: List[str]) -> float:
+    """متوسط الحيرة (perplexity) على مجموعة النصوص"""
+    losses = []
+    with torch.no_grad():
+        for text in texts:
+            ids = tokenizer.encode(text, return_tensors="pt")
+            losses.append(model(ids, labels=ids).loss.item())
+    return float(torch.exp(torch.tensor(losses).mean()))
+
+
+def _greedy_outputs(model, tokenizer, prompts: List[str], new_tokens: int):
+    """توليد جشع ثابت مع قياس الزمن لكل مطالبة"""
+    outputs, latencies = [], []
+    with torch.no_grad():
+        for prompt in prompts:
+            ids = tokenizer.encode(prompt, return_tensors="pt")
+            start = time.perf_counter()
+            out = model.generate(
+                ids,
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id
+            )
+            latencies.append(time.perf_counter() - start)
+            outputs.append(out[0, ids.shape[1]:].tolist())
+    return outputs, latencies
+
+
+def compare_with_fp32(model_name: str = "aubmindlab/aragpt2-base",
+                      prompts: Optional[List[str]] = None,
+                      new_tokens: int = 40) -> Dict[str, Dict[str, float]]:
+    """
+    مقارنة جنباً إلى جنب بين fp32 و int8 على مجموعة ثابتة من المطالبات العربية:
+    زمن التوليد، حجم الأوزان، الحيرة، ونسبة تطابق ال tokens مع fp32
+    """
+    prompts = prompts or ARABIC_PROMPTS
+    torch.manual_seed(0)
+    tokenizer = GPT2Tokenizer.from_pretrained(model_name)
+
+    start = time.perf_counter()
+    fp32_model = GPT2LMHeadModel.from_pretrained(model_name).eval()
+    fp32_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    int8_model = load_quantized(model_name)
+    int8_load = time.perf_counter() - start
+
+    fp32_out, fp32_lat = _greedy_outputs(fp32_model, tokenizer, prompts, new_tokens)
+    int8_out, int8_lat = _greedy_outputs(int8_model, tokenizer, prompts, new_tokens)
+
+    # نسبة ال tokens المتطابقة في نفس الموضع مع مخرجات fp32
+    matches = sum(a == b for ref, out in zip(fp32_out, int8_out) for a, b in zip(ref, out))
+    total = sum(len(ref) for ref in fp32_out) or 1
+
+    report = {}
+    for name, model, load_time, latencies in (
+        ("fp32", fp32_model, fp32_load, fp32_lat),
+        ("int8", int8_model, int8_load, int8_lat)
+    ):
+        report[name] = {
+            "load_seconds": load_time,
+            "avg_latency_ms": 1000 * sum(latencies) / len(latencies),
+            "ms_per_token": 1000 * sum(latencies) / (len(latencies) * new_tokens),
+            "weights_mb": serialized_size(model) / (1024 * 1024),
+            "perplexity": _perplexity(model, tokenizer, prompts)
+        }
+    report["int8"]["token_agreement"] = matches / total
+    report["fp32"]["token_agreement"] = 1.0
+    return report
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    """طباعة تقرير المقارنة كجدول"""
+    metrics = ["load_seconds", "avg_latency_ms", "ms_per_token", "weights_mb", "perplexity", "token_agreement"]
+    print(f"{'metric':<18}{'fp32':>12}{'int8':>12}")
+    for metric in metrics:
+        print(f"{metric:<18}{report['fp32'][metric]:>12.3f}{report['int8'][metric]:>12.3f}")
+
+
+if __name__ == "__main__":
+    print_report(compare_with_fp32())
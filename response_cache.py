@@ -0,0 +1,120 @@
+# ------------------------ ذاكرة الردود المؤقتة (LRU + TTL) ------------------------
+from collections import OrderedDict
+from typing import Dict, Optional
+import json
+import random
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    ذاكرة مؤقتة للردود أمام توليد النموذج، مفتاحها المدخل المنظف وإعدادات التوليد،
+    محفوظة في قاعدة البيانات حتى تبقى بعد إعادة التشغيل
+    """
+
+    def __init__(self, db=None, max_entries: int = 500, ttl_seconds: float = 7 * 24 * 3600):
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bypassed": 0
+        }
+        self._load()
+
+    @staticmethod
+    def make_key(clean_prompt: str, max_length: int, temperature: float, mode: str) -> str:
+        """مفتاح الذاكرة: المدخل بعد clean_input مع إعدادات التوليد والنمط"""
+        return json.dumps([clean_prompt, max_length, temperature, mode], ensure_ascii=False)
+
+    def _load(self) -> None:
+        """تحميل المدخلات غير المنتهية من قاعدة البيانات (الأقدم إنشاءً أولاً)"""
+        if not self.db:
+            return
+        now = time.time()
+        for key, candidates_json, created_at in self.db.load_cached_responses(self.max_entries):
+            if now - created_at > self.ttl_seconds:
+                continue
+            self._entries[key] = {
+                "candidates": json.loads(candidates_json),
+                "created_at": created_at
+            }
+
+    def get(self, key: str, policy: str = "candidates", candidates: int = 1) -> Optional[str]:
+        """
+        استرجاع رد مخزن.
+
+        Args:
+            policy (str): "bypass" لتجاوز الذاكرة، أو "candidates" لإرجاع أحد الردود المخزنة.
+            candidates (int): عدد الردود المختلفة التي تُجمع قبل أن تبدأ الذاكرة بالإجابة.
+        """
+        with self._lock:
+            if policy == "bypass":
+                self.stats["bypassed"] += 1
+                return None
+
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created_at"] > self.ttl_seconds:
+                self._remove(key)
+                self.stats["expirations"] += 1
+                entry = None
+
+            if entry is None or len(entry["candidates"]) < candidates:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return random.choice(entry["candidates"][:candidates])
+
+    def peek(self, key: str) -> Optional[str]:
+        """
+        أي رد مخزن غير منتهٍ للمفتاح بغض النظر عن سياسة النمط وعدد المرشحين؛
+        يُستخدم بديلاً عندما لا يلحق النموذج بالمهلة. لا يؤثر على العدادات.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry["candidates"]:
+                return None
+            if time.time() - entry["created_at"] > self.ttl_seconds:
+                return None
+            return random.choice(entry["candidates"])
+
+    def put(self, key: str, response: str, policy: str = "candidates", candidates: int = 1) -> None:
+        """إضافة رد مولد كمرشح جديد للمفتاح"""
+        if policy == "bypass" or not response.strip():
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"candidates": [], "created_at": time.time()}
+                self._entries[key] = entry
+            if response not in entry["candidates"]:
+                entry["candidates"] = (entry["candidates"] + [response])[-candidates:]
+            self._entries.move_to_end(key)
+
+            if self.db:
+                self.db.save_cached_response(
+                    key, json.dumps(entry["candidates"], ensure_ascii=False), entry["created_at"]
+                )
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self.db:
+            self.db.delete_cached_response(key)
+
+    def get_stats(self) -> Dict[str, int]:
+        """عدادات الإصابة/الإخفاق/الإخلاء"""
+        with self._lock:
+            return dict(self.stats, size=len(self._entries))
@@ -1,210 +1,501 @@
-from PyQt5.QtCore import QObject, pyqtSignal
-import traceback
-import random
-from datetime import datetime
-from typing import Optional, Tuple, Dict, List
-import json
-import re
-from collections import defaultdict
-from ai_model import AraGPT2Assistant
-
-
-
-class ResponseHandler(QObject):
-    response_ready = pyqtSignal(str, str, str)  # text, mode, emotion
-    
-    COMMON_RESPONSES = {
-        r'اسمك|ما اسمك': ("أنا ماني، مساعدك الذكي!", "stable", "happy"),
-        r'كيف حالك|أخبارك': ("أنا بخير دائمًا، شكرًا لسؤالك!", "stable", "happy"),
-        r'مساعدة|مساعده': ("يمكنك طرح أي سؤال، سأحاول مساعدتك!", "creative", "neutral"),
-        r'شكرًا|متشكر': ("العفو! دائمًا تحت الخدمة.", "direct", "happy")
-    }
-
-    def process_message(self, message):
-        try:
-            # التحقق من الاستجابات الشائعة أولاً
-            msg_lower = message.lower()
-            for pattern, response in self.COMMON_RESPONSES.items():
-                if re.search(pattern, msg_lower):
-                    return response
-            
-            # إذا لم يكن سؤالاً شائعاً
-            return self.generate_ai_response(message)
-            
-        except Exception as e:
-            return (f"Error: {str(e)}", "error", "neutral")
-
-    def generate_ai_response(self, message):
-        # توليد الرد من النموذج اللغوي
-        raw_response = self.ai.generate_response(message)
-        
-        # تحديد العاطفة
-        emotion = self.detect_emotion(raw_response)
-        
-        # تحديد نمط الرد
-        mode = "creative" if any(kw in message for kw in ["رأيك", "تفسير"]) else "stable"
-        
-        return (raw_response, mode, emotion)
-
-    def detect_emotion(self, text):
-        positive_words = ["ممتاز", "شكرًا", "سعيد"]
-        negative_words = ["مشكلة", "خطأ", "حزين"]
-        
-        if any(word in text for word in positive_words):
-            return "happy"
-        elif any(word in text for word in negative_words):
-            return "sad"
-        return "neutral"
-
-    def __init__(self, db, context):
-        super().__init__()
-        self.db = db
-        self.context = context
-        self.learning_enabled = True
-        self.conversation_history = []
-        self.user_profile = {}
-        self.ai = AraGPT2Assistant()
-        self.current_mode = "stable"
-        self.last_interaction = None
-        self.max_response_length = 150
-        
-        self._setup_response_systems()
-        self._load_initial_data()
-        
-        # إعدادات الأداء
-        self.settings = {
-            "max_processing_time": 3,
-            "min_confidence": 0.6,
-            "learning_rate": 0.1
-        }
-
-    def _setup_response_systems(self):
-        """تهيئة أنظمة الاستجابة"""
-        self.modes = {
-            "direct": {
-                "temperature": 0.5,
-                "max_length": 80,
-                "emoji": "⚡",
-                "style": {"color": "#4CAF50", "bg": "#E8F5E9"}
-            },
-            "stable": {
-                "temperature": 0.7,
-                "max_length": 120,
-                "emoji": "🔍",
-                "style": {"color": "#2196F3", "bg": "#E3F2FD"}
-            },
-            "creative": {
-                "temperature": 0.9,
-                "max_length": 200,
-                "emoji": "🎨",
-                "style": {"color": "#FF9800", "bg": "#FFF3E0"}
-            }
-        }
-        
-        self.emotions = {
-            "happy": {
-                "responses": ["أهلاً بك! 😊", "يومك جميل! 🌞"],
-                "triggers": ["مرحبا", "مساء الخير", "سعيد"]
-            },
-            "sad": {
-                "responses": ["أنا هنا لمساعدتك 🫂", "يمكنك التحدث معي 💬"],
-                "triggers": ["حزين", "تعبان", "مشكلة"]
-            }
-        }
-        
-        self.commands = {
-            "وضع سريع": self._set_direct_mode,
-            "وضع دقيق": self._set_stable_mode,
-            "مساعدة": self._show_help
-        }
-
-    def _load_initial_data(self):
-        """تحميل البيانات الأولية"""
-        try:
-            self.common_questions = self.db.get_common_questions() or {
-                "ما هو اسمك؟": "أنا ماني، مساعدك الذكي!",
-                "كيف حالك؟": "أنا بخير، شكراً لسؤالك!"
-            }
-        except Exception as e:
-            print(f"خطأ في تحميل البيانات: {str(e)}")
-            self.common_questions = {}
-    
-    def process_message(self, message: str):
-        try:
-            if not message.strip():
-                return "الرجاء إدخال رسالة صحيحة", "error", "neutral"
-                
-            # التحقق من الأوامر
-            lower_msg = message.lower()
-            for cmd, handler in self.commands.items():
-                if cmd in lower_msg:
-                    return handler()
-            
-            # توليد الرد
-            mode_settings = self.modes[self.current_mode]
-            response = self.ai.generate_response(
-                message,
-                max_length=mode_settings["max_length"],
-                temperature=mode_settings["temperature"]
-            )
-            
-            # تحديد العاطفة بناء على المحتوى
-            emotion = self._detect_emotion(message)
-            return response, self.current_mode, emotion
-            
-        except Exception as e:
-            error_msg = f"حدث خطأ: {str(e)}"
-            return error_msg, "error", "neutral"
-    
-    def _detect_emotion(self, text):
-        """تحليل العاطفة من النص"""
-        if any(word in text for word in ["مرحبا", "اهلا", "سلام"]):
-            return "happy"
-        elif any(word in text for word in ["حزين", "مشكلة", "مساعدة"]):
-            return "sad"
-        return "neutral"
-
-    def _enhance_response(self, response: str) -> str:
-        """تحسين الرد النهائي"""
-        # إزالة التكرار
-        response = re.sub(r'\b(\w+)\b(?=.*\b\1\b)', '', response)
-        # إضافة إيموجي
-        emojis = ["✨", "🌟", "💡", "🎯"]
-        return f"{response.strip()} {random.choice(emojis)}"
-
-    def _set_direct_mode(self) -> Tuple[str, str]:
-        self.current_mode = "direct"
-        return "تم تفعيل الوضع السريع ⚡", "direct"
-
-    def _set_stable_mode(self) -> Tuple[str, str]:
-        self.current_mode = "stable"
-        return "تم تفعيل الوضع الدقيق 🔍", "stable"
-
-    def _show_help(self) -> Tuple[str, str]:
-        help_text = """
-        الأوامر المتاحة:
-        - وضع سريع: ردود سريعة
-        - وضع دقيق: ردود مفصلة
-        - مساعدة: عرض هذه القائمة
-        """
-        return help_text, "stable"
-
-    def _log_error(self, error: Exception, message: str):
-        """تسجيل الأخطاء"""
-        error_data = {
-            "timestamp": datetime.now().isoformat(),
-            "message": message,
-            "error": str(error),
-            "traceback": traceback.format_exc()
-        }
-        self.db.log_error(error_data)
-        print(f"حدث خطأ: {error_data}")
-
-    def save_conversation(self):
-        """حفظ المحادثة في قاعدة البيانات"""
-        if self.last_interaction:
-            self.db.save_interaction({
-                "input": self.last_interaction.get("user_message"),
-                "output": self.last_interaction.get("ai_response"),
-                "timestamp": datetime.now()
+from PyQt5.QtCore import QObject, pyqtSignal
+import traceback
+import random
+from datetime import datetime
+from typing import Optional, Tuple, Dict, List
+import json
+import re
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import difflib
+import threading
+import time
+from ai_model import AraGPT2Assistant
+from inference_worker import get_inference_worker
+from response_cache import ResponseCache
+from arabic_text import normalize_arabic
+
+
+
+class ResponseHandler(QObject):
+    response_ready = pyqtSignal(str, str, str)  # text, mode, emotion
+    response_started = pyqtSignal(str, str)  # mode, emotion (بداية الرد المبثوث)
+    response_chunk = pyqtSignal(str)  # جزء جديد من الرد
+    response_finished = pyqtSignal(str, str, str)  # النص النهائي بعد التنظيف، mode، emotion
+    
+    COMMON_RESPONSES = {
+        r'اسمك|ما اسمك': ("أنا ماني، مساعدك الذكي!", "stable", "happy"),
+        r'كيف حالك|أخبارك': ("أنا بخير دائمًا، شكرًا لسؤالك!", "stable", "happy"),
+        r'مساعدة|مساعده': ("يمكنك طرح أي سؤال، سأحاول مساعدتك!", "creative", "neutral"),
+        r'شكرًا|متشكر': ("العفو! دائمًا تحت الخدمة.", "direct", "happy")
+    }
+
+    # الأنماط نفسها مطبقة على النص الموحد (تطابق الرسالة بعد normalize_arabic)
+    _COMMON_PATTERNS = [
+        (re.compile("|".join(normalize_arabic(alt) for alt in pattern.split("|"))), response)
+        for pattern, response in COMMON_RESPONSES.items()
+    ]
+
+    # ردود جاهزة عندما لا يلحق النموذج بالمهلة ولا يوجد بديل أفضل
+    CANNED_RESPONSES = [
+        "عذراً، استغرق التفكير وقتاً أطول من المعتاد. هل يمكنك إعادة صياغة سؤالك؟",
+        "لم أتمكن من تجهيز رد كامل الآن، حاول مرة أخرى بعد قليل."
+    ]
+
+    # طبقات الرد من الأفضل إلى الأضعف
+    RESPONSE_TIERS = ["common", "cache", "model", "model_partial", "cache_fallback", "common_question", "canned"]
+
+    def process_message(self, message):
+        try:
+            # التحقق من الاستجابات الشائعة أولاً
+            response = self._match_common_response(message)
+            if response is not None:
+                return response
+            
+            # إذا لم يكن سؤالاً شائعاً
+            return self.generate_ai_response(message)
+            
+        except Exception as e:
+            return (f"Error: {str(e)}", "error", "neutral")
+
+    def generate_ai_response(self, message):
+        # توليد الرد من النموذج اللغوي
+        raw_response = self.ai.generate_response(message)
+        
+        # تحديد العاطفة
+        emotion = self.detect_emotion(raw_response)
+        
+        # تحديد نمط الرد
+        mode = "creative" if any(kw in message for kw in ["رأيك", "تفسير"]) else "stable"
+        
+        return (raw_response, mode, emotion)
+
+    def detect_emotion(self, text):
+        positive_words = ["ممتاز", "شكرًا", "سعيد"]
+        negative_words = ["مشكلة", "خطأ", "حزين"]
+        
+        if any(word in text for word in positive_words):
+            return "happy"
+        elif any(word in text for word in negative_words):
+            return "sad"
+        return "neutral"
+
+    def __init__(self, db, context):
+        super().__init__()
+        self.db = db
+        self.context = context
+        self.learning_enabled = True
+        self.conversation_history = []
+        self.user_profile = {}
+        self.ai = AraGPT2Assistant(lazy=True)
+        self.worker = get_inference_worker(self.ai)  # عامل استدلال واحد مشترك
+        # البحث في القاعدة قبل التوليد يتم خارج خيط الواجهة وبترتيب الرسائل
+        self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ResponseDispatch")
+        self.current_mode = "stable"
+        self.last_interaction = None
+        self.max_response_length = 150
+        
+        self._setup_response_systems()
+        self._load_initial_data()
+        self.response_cache = ResponseCache(self.db)
+        
+        # إعدادات الأداء
+        self.settings = {
+            "max_processing_time": 3,
+            "min_confidence": 0.6,
+            "learning_rate": 0.1,
+            "min_partial_words": 5,  # أقل رد جزئي يُعرض بدل البديل
+            "deadline_grace": 0.5  # هامش انتظار نتيجة العامل بعد انتهاء المهلة
+        }
+        self.slo_stats = {"total": 0, "within_deadline": 0, "tiers": Counter()}
+        self._slo_lock = threading.Lock()
+
+    def _setup_response_systems(self):
+        """تهيئة أنظمة الاستجابة"""
+        self.modes = {
+            "direct": {
+                "temperature": 0.5,
+                "max_length": 80,
+                "emoji": "⚡",
+                "style": {"color": "#4CAF50", "bg": "#E8F5E9"},
+                "cache": {"policy": "candidates", "candidates": 1}
+            },
+            "stable": {
+                "temperature": 0.7,
+                "max_length": 120,
+                "emoji": "🔍",
+                "style": {"color": "#2196F3", "bg": "#E3F2FD"},
+                "cache": {"policy": "candidates", "candidates": 3}
+            },
+            "creative": {
+                "temperature": 0.9,
+                "max_length": 200,
+                "emoji": "🎨",
+                "style": {"color": "#FF9800", "bg": "#FFF3E0"},
+                "cache": {"policy": "bypass", "candidates": 0}  # الردود الإبداعية تُولد دائماً
+            }
+        }
+        
+        self.emotions = {
+            "happy": {
+                "responses": ["أهلاً بك! 😊", "يومك جميل! 🌞"],
+                "triggers": ["مرحبا", "مساء الخير", "سعيد"]
+            },
+            "sad": {
+                "responses": ["أنا هنا لمساعدتك 🫂", "يمكنك التحدث معي 💬"],
+                "triggers": ["حزين", "تعبان", "مشكلة"]
+            }
+        }
+        
+        self.commands = {
+            "وضع سريع": self._set_direct_mode,
+            "وضع دقيق": self._set_stable_mode,
+            "مساعدة": self._show_help
+        }
+
+    def _load_initial_data(self):
+        """تحميل البيانات الأولية"""
+        try:
+            self.common_questions = self.db.get_common_questions() or {
+                "ما هو اسمك؟": "أنا ماني، مساعدك الذكي!",
+                "كيف حالك؟": "أنا بخير، شكراً لسؤالك!"
+            }
+        except Exception as e:
+            print(f"خطأ في تحميل البيانات: {str(e)}")
+            self.common_questions = {}
+    
+    def process_message(self, message: str):
+        try:
+            if not message.strip():
+                return "الرجاء إدخال رسالة صحيحة", "error", "neutral"
+                
+            # التحقق من الأوامر
+            lower_msg = message.lower()
+            for cmd, handler in self.commands.items():
+                if cmd in lower_msg:
+                    return handler()
+            
+            started = time.monotonic()
+            deadline = started + self.settings["max_processing_time"]
+            mode_settings = self.modes[self.current_mode]
+            cache_key = self._cache_key(message, self.current_mode)
+            response = self._fast_response(message)
+            if response is not None:
+                tier = "common"
+            else:
+                response = self._cached_response(message, cache_key, mode_settings)
+
+            if response is None:
+                # توليد الرد عبر طابور العامل المشترك ضمن سياق المحادثة
+                future = self.worker.submit(
+                    message,
+                    max_length=mode_settings["max_length"],
+                    temperature=mode_settings["temperature"],
+                    assistant=self.ai,
+                    use_context=True,
+                    deadline=deadline
+                )
+                try:
+                    generated = future.result(
+                        timeout=max(0.0, deadline - time.monotonic()) + self.settings["deadline_grace"]
+                    )
+                    reason = future.outcome.get("reason")
+                except FutureTimeout:
+                    # العامل مشغول بطلبات سابقة: لا ننتظر أكثر
+                    generated, reason = "", "deadline"
+                response, tier = self._resolve_tier(message, cache_key, generated, reason)
+                if tier == "model":
+                    self.response_cache.put(cache_key, response, **mode_settings["cache"])
+            elif tier != "common":
+                tier = "cache"
+            self._record_tier(message, response, tier, started, deadline)
+            self.context.update_context(message, response)
+            
+            # تحديد العاطفة بناء على المحتوى
+            emotion = self._detect_emotion(message)
+            return response, self.current_mode, emotion
+            
+        except Exception as e:
+            error_msg = f"حدث خطأ: {str(e)}"
+            return error_msg, "error", "neutral"
+
+    def stream_message(self, message: str):
+        """
+        معالجة الرسالة بدون حجز الخيط المستدعي: يُبث الرد جزءاً بجزء عبر الإشارات
+        عندما يُعالج الطلب منفرداً، أو يصل كاملاً عند دمجه في دفعة مع طلبات أخرى
+        """
+        try:
+            if not message.strip():
+                self.response_finished.emit("الرجاء إدخال رسالة صحيحة", "error", "neutral")
+                return
+
+            # الأوامر تُرد مباشرة بدون توليد
+            lower_msg = message.lower()
+            for cmd, handler in self.commands.items():
+                if cmd in lower_msg:
+                    text, mode = handler()[:2]
+                    self.response_finished.emit(text, mode, "neutral")
+                    return
+
+            # إعدادات النمط تُثبت لحظة الإرسال حتى لو تغير النمط أثناء الانتظار
+            started_at = time.monotonic()
+            deadline = started_at + self.settings["max_processing_time"]
+            mode = self.current_mode
+            return self._dispatcher.submit(self._dispatch_message, message, mode, started_at, deadline)
+
+        except Exception as e:
+            self.response_finished.emit(f"حدث خطأ: {str(e)}", "error", "neutral")
+
+    def _dispatch_message(self, message: str, mode: str, started_at: float, deadline: float):
+        """الرد السريع أو المخزن أو إرسال الرسالة للعامل (على خيط الإرسال وليس خيط الواجهة)"""
+        try:
+            mode_settings = self.modes[mode]
+            emotion = self._detect_emotion(message)
+
+            cache_key = self._cache_key(message, mode)
+            fast = self._fast_response(message)
+            if fast is not None:
+                self._record_tier(message, fast, "common", started_at, deadline)
+                self.context.update_context(message, fast)
+                self.response_finished.emit(fast, mode, emotion)
+                return
+
+            cached = self._cached_response(message, cache_key, mode_settings)
+            if cached is not None:
+                self._record_tier(message, cached, "cache", started_at, deadline)
+                self.context.update_context(message, cached)
+                self.response_finished.emit(cached, mode, emotion)
+                return
+
+            started = []
+            finished = []
+            finish_lock = threading.Lock()
+
+            def on_chunk(chunk):
+                if finished:
+                    return
+                if not started:
+                    started.append(True)
+                    self.response_started.emit(mode, emotion)
+                self.response_chunk.emit(chunk)
+
+            def finish(generated, reason):
+                # الرد يُنهى مرة واحدة: إما من العامل أو من مؤقت المهلة
+                with finish_lock:
+                    if finished:
+                        return
+                    finished.append(True)
+                response, tier = self._resolve_tier(message, cache_key, generated, reason)
+                if tier == "model":
+                    self.response_cache.put(cache_key, response, **mode_settings["cache"])
+                self._record_tier(message, response, tier, started_at, deadline)
+                self.context.update_context(message, response)
+                self.response_finished.emit(response, mode, emotion)
+
+            def on_done(future):
+                timer.cancel()
+                try:
+                    finish(future.result(), future.outcome.get("reason"))
+                except Exception as e:
+                    with finish_lock:
+                        if finished:
+                            return
+                        finished.append(True)
+                    self.response_finished.emit(f"حدث خطأ: {str(e)}", "error", "neutral")
+
+            # إذا بقي الطلب في الطابور خلف طلبات أخرى نرد بالبديل عند انتهاء المهلة
+            timer = threading.Timer(
+                self.settings["max_processing_time"] + self.settings["deadline_grace"],
+                finish, args=("", "deadline")
+            )
+            timer.daemon = True
+
+            future = self.worker.submit(
+                message,
+                max_length=mode_settings["max_length"],
+                temperature=mode_settings["temperature"],
+                on_chunk=on_chunk,
+                assistant=self.ai,
+                use_context=True,
+                deadline=deadline
+            )
+            timer.start()
+            future.add_done_callback(on_done)
+            return future
+
+        except Exception as e:
+            self.response_finished.emit(f"حدث خطأ: {str(e)}", "error", "neutral")
+
+    def _cache_key(self, message: str, mode: str) -> str:
+        """مفتاح ذاكرة الردود للرسالة حسب إعدادات النمط"""
+        mode_settings = self.modes[mode]
+        return ResponseCache.make_key(
+            self.ai.clean_input(message),
+            mode_settings["max_length"],
+            mode_settings["temperature"],
+            mode
+        )
+
+    def _cached_response(self, message: str, cache_key: str, mode_settings: Dict) -> Optional[str]:
+        """رد مخزن للرسالة إن وجد، مع إضافته لسياق المحادثة الخاص بالنموذج"""
+        cached = self.response_cache.get(cache_key, **mode_settings["cache"])
+        if cached is not None:
+            self._commit_turn(message, cached)
+        return cached
+
+    def _commit_turn(self, message: str, response: str) -> None:
+        """
+        إضافة دور لسياق النموذج عبر طابور العامل: ذاكرة KV تُعدل على خيط العامل فقط
+        وبترتيب الرسائل حتى لو كانت رسالة سابقة ما زالت قيد التوليد
+        """
+        # لا نحمّل النموذج لأجل رد سريع أو مخزن؛ السياق يُحدث فقط إذا كان محملاً
+        if self.ai.is_loaded:
+            self.worker.submit_turn(message, response, assistant=self.ai)
+
+    # ------------------------ طبقات الرد ضمن المهلة ------------------------
+    def _resolve_tier(self, message: str, cache_key: str, generated: str,
+                      reason: Optional[str]) -> Tuple[str, str]:
+        """
+        اختيار الرد حسب نتيجة التوليد: الرد الكامل، ثم الجزئي إن كان كافياً،
+        ثم البدائل السريعة عند تجاوز المهلة.
+
+        Returns:
+            (الرد، الطبقة)
+        """
+        generated = (generated or "").strip()
+        if reason != "deadline" and generated and not generated.startswith("Error:"):
+            return generated, "model"
+        if reason == "deadline" and len(generated.split()) >= self.settings["min_partial_words"]:
+            # العامل لا يضيف الرد المقطوع للسياق، نضيفه هنا لأنه ما رآه المستخدم
+            self._commit_turn(message, generated)
+            return generated, "model_partial"
+        return self._fallback_response(message, cache_key)
+
+    def _fallback_response(self, message: str, cache_key: str) -> Tuple[str, str]:
+        """أسرع بديل متاح: رد مخزن بأي سياسة، ثم أقرب سؤال شائع، ثم رد جاهز"""
+        cached = self.response_cache.peek(cache_key)
+        if cached is not None:
+            return cached, "cache_fallback"
+        answer = self._match_common_question(message)
+        if answer is not None:
+            return answer, "common_question"
+        return random.choice(self.CANNED_RESPONSES), "canned"
+
+    def _match_common_response(self, message: str) -> Optional[Tuple[str, str, str]]:
+        """(الرد، النمط، العاطفة) لأول نمط من الردود الشائعة يطابق الرسالة الموحدة"""
+        normalized = normalize_arabic(message)
+        for pattern, response in self._COMMON_PATTERNS:
+            if pattern.search(normalized):
+                return response
+        return None
+
+    def _fast_response(self, message: str) -> Optional[str]:
+        """
+        رد بدون النموذج: نمط من الردود الشائعة أو سؤال شائع مطابق بعد التوحيد
+        (بحث على فهرس العمود الموحد)
+        """
+        common = self._match_common_response(message)
+        if common is not None:
+            answer = common[0]
+        else:
+            match = self.db.lookup_question(message)
+            if match is None:
+                return None
+            question, answer = match
+            self.db.update_question_usage(question)
+        self._commit_turn(message, answer)
+        return answer
+
+    def _match_common_question(self, message: str) -> Optional[str]:
+        """أقرب سؤال شائع بنسبة تشابه لا تقل عن min_confidence"""
+        cleaned = normalize_arabic(message)
+        best_answer, best_ratio = None, 0.0
+        for question, answer in self.common_questions.items():
+            ratio = difflib.SequenceMatcher(None, cleaned, normalize_arabic(question)).ratio()
+            if ratio > best_ratio:
+                best_answer, best_ratio = answer, ratio
+        if best_ratio >= self.settings["min_confidence"]:
+            return best_answer
+        return None
+
+    def _record_tier(self, message: str, response: str, tier: str,
+                     started: float, deadline: float) -> None:
+        """تسجيل الطبقة التي خدمت الرد وزمنه مقارنة بالمهلة"""
+        finished = time.monotonic()
+        met_deadline = finished <= deadline
+        with self._slo_lock:
+            self.slo_stats["total"] += 1
+            self.slo_stats["tiers"][tier] += 1
+            if met_deadline:
+                self.slo_stats["within_deadline"] += 1
+        self.last_interaction = {
+            "user_message": message,
+            "ai_response": response,
+            "tier": tier,
+            "latency": finished - started,
+            "met_deadline": met_deadline
+        }
+
+    def get_slo_report(self) -> Dict:
+        """نسبة الردود ضمن المهلة وتوزيعها على الطبقات"""
+        with self._slo_lock:
+            total = self.slo_stats["total"]
+            return {
+                "total": total,
+                "within_deadline": self.slo_stats["within_deadline"],
+                "within_deadline_ratio": self.slo_stats["within_deadline"] / total if total else 0.0,
+                "tiers": {tier: self.slo_stats["tiers"][tier] for tier in self.RESPONSE_TIERS}
+            }
+
+    def _detect_emotion(self, text):
+        """تحليل العاطفة من النص"""
+        if any(word in text for word in ["مرحبا", "اهلا", "سلام"]):
+            return "happy"
+        elif any(word in text for word in ["حزين", "مشكلة", "مساعدة"]):
+            return "sad"
+        return "neutral"
+
+    def _enhance_response(self, response: str) -> str:
+        """تحسين الرد النهائي"""
+        # إزالة التكرار
+        response = re.sub(r'\b(\w+)\b(?=.*\b\1\b)', '', response)
+        # إضافة إيموجي
+        emojis = ["✨", "🌟", "💡", "🎯"]
+        return f"{response.strip()} {random.choice(emojis)}"
+
+    def _set_direct_mode(self) -> Tuple[str, str]:
+        self.current_mode = "direct"
+        return "تم تفعيل الوضع السريع ⚡", "direct"
+
+    def _set_stable_mode(self) -> Tuple[str, str]:
+        self.current_mode = "stable"
+        return "تم تفعيل الوضع الدقيق 🔍", "stable"
+
+    def _show_help(self) -> Tuple[str, str]:
+        help_text = """
+        الأوامر المتاحة:
+        - وضع سريع: ردود سريعة
+        - وضع دقيق: ردود مفصلة
+        - مساعدة: عرض هذه القائمة
+        """
+        return help_text, "stable"
+
+    def _log_error(self, error: Exception, message: str):
+        """تسجيل الأخطاء"""
+        error_data = {
+            "timestamp": datetime.now().isoformat(),
+            "message": message,
+            "error": str(error),
+            "traceback": traceback.format_exc()
+        }
+        self.db.log_error(error_data)
+        print(f"حدث خطأ: {error_data}")
+
+    def save_conversation(self):
+        """حفظ المحادثة في قاعدة البيانات"""
+        if self.last_interaction:
+            self.db.save_interaction({
+                "input": self.last_interaction.get("user_message"),
+                "output": self.last_interaction.get("ai_response"),
+                "timestamp": datetime.now()
             })
\ No newline at end of file
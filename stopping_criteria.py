@@ -0,0 +1,103 @@
+# ------------------------ معايير التوقف المبكر أثناء التوليد ------------------------
+from transformers import StoppingCriteria
+from typing import Callable, Dict, List, Optional, Tuple
+import re
+import time
+
+
+class ResponseStopper:
+    """
+    معايير توقف تُفحص على النص المولد أثناء فك الترميز، مطابقة لما كان
+    clean_output يحذفه بعد انتهاء التوليد الكامل
+    """
+
+    def __init__(self, stop_phrases: List[str], max_sentences: int = 3,
+                 max_chars: int = 500, max_punctuation_run: int = 4):
+        self.stop_phrases = stop_phrases
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        self._punctuation_run = re.compile(r'([?.!؟،,])\1{%d,}' % (max_punctuation_run - 1))
+
+    def check(self, text: str) -> Optional[Tuple[int, str]]:
+        """
+        فحص النص المولد حتى الآن.
+
+        Returns:
+            (موضع القص، سبب التوقف) إذا لم يعد هناك فائدة من متابعة التوليد، وإلا None.
+        """
+        # 1. عبارة غير مرغوبة: كل ما بعدها يُحذف
+        cuts = [text.find(p) for p in self.stop_phrases if p in text]
+        if cuts:
+            return min(cuts), "stop_phrase"
+
+        # 2. اكتمال عدد الجمل المسموح: الجمل التالية تُحذف
+        completed = 0
+        position = 0
+        for segment in text.split(".")[:-1]:
+            position += len(segment) + 1
+            if segment.strip():
+                completed += 1
+                if completed >= self.max_sentences:
+                    return position, "sentences"
+
+        # 3. تجاوز حد الأحرف
+        if len(text.strip()) >= self.max_chars:
+            return len(text), "chars"
+
+        # 4. تكرار علامات الترقيم يعني أن التوليد انحرف
+        match = self._punctuation_run.search(text)
+        if match:
+            return match.start() + 1, "punctuation"
+
+        return None
+
+
+class TextStoppingCriteria(StoppingCriteria):
+    """تكييف ResponseStopper مع model.generate للدفعات، مع مهلة وبث نصي لكل صف"""
+
+    def __init__(self, stopper: ResponseStopper, tokenizer, prompt_length: int,
+                 deadline: Optional[float] = None, budgets: Optional[List[int]] = None,
+                 deadlines: Optional[List[Optional[float]]] = None,
+                 on_chunks: Optional[List[Optional[Callable[[str], None]]]] = None):
+        self.stopper = stopper
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.deadline = deadline  # time.monotonic() المطلق للدفعة كلها
+        self.budgets = budgets  # أقصى عدد tokens جديدة لكل صف
+        self.deadlines = deadlines  # مهلة كل صف
+        self.on_chunks = on_chunks  # دالة بث لكل صف (أو None)
+        self.deadline_hit = False
+        self.limits: Dict[int, int] = {}  # الصفوف المنتهية: عدد ال tokens المحتفظ بها
+        self.deadline_rows = set()  # الصفوف التي انتهت بمهلتها
+        self.emitted: Dict[int, str] = {}
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        now = time.monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            self.deadline_hit = True
+            return True
+        generated = input_ids.shape[1] - self.prompt_length
+        for i, row in enumerate(input_ids):
+            if i in self.limits:
+                continue
+            if self.deadlines is not None and self.deadlines[i] is not None and now >= self.deadlines[i]:
+                # الصف يُقص عند مهلته وتكمل بقية الدفعة
+                self.limits[i] = generated
+                self.deadline_rows.add(i)
+                continue
+            steps = generated if self.budgets is None else min(generated, self.budgets[i])
+            text = self.tokenizer.decode(row[self.prompt_length:self.prompt_length + steps], skip_special_tokens=True)
+            stop = self.stopper.check(text)
+            if stop is not None or (self.budgets is not None and generated >= self.budgets[i]):
+                self.limits[i] = steps
+            if self.on_chunks is not None and self.on_chunks[i] is not None and not text.endswith("\ufffd"):
+                self.emit(i, text if stop is None else text[:stop[0]])
+        # نتوقف عندما لا يبقى في الدفعة تسلسل يستفيد من tokens إضافية
+        return len(self.limits) == len(input_ids)
+
+    def emit(self, row: int, text: str) -> None:
+        """بث ما زاد من نص الصف منذ آخر جزء أُرسل"""
+        emitted = self.emitted.get(row, "")
+        if len(text) > len(emitted):
+            self.on_chunks[row](text[len(emitted):])
+            self.emitted[row] = text
@@ -0,0 +1,114 @@
+# ------------------------ طبقة الوصول المشتركة لقاعدة SQLite ------------------------
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from arabic_text import register_sqlite_functions
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStorage:
+    """
+    خدمة تخزين واحدة لكل ملف قاعدة بيانات: وضع WAL، اتصال قراءة لكل خيط
+    (القراءات لا تنتظر الكتابة)، وكاتب واحد مُسلسل لكل الخيوط
+    """
+
+    def __init__(self, db_path: str, synchronous: str = "NORMAL", busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+
+        # الكاتب الوحيد؛ المعاملات تُدار يدوياً عبر write()
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        # يسري فقط على ملف جديد قبل إنشاء الجداول؛ يسمح باسترجاع المساحة تدريجياً
+        self._writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL يُحفظ في ملف القاعدة نفسه فيكفي تفعيله مرة واحدة
+        self._writer.execute("PRAGMA journal_mode = WAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=self.busy_timeout_ms / 1000
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        # NORMAL مع WAL: لا fsync إلا عند نقاط الحفظ، بدون خطر تلف القاعدة
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        # دوال التوحيد تستخدمها الأعمدة الموحدة و triggers فهارس البحث
+        register_sqlite_functions(conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """اتصال القراءة الخاص بالخيط الحالي (يُنشأ عند أول استخدام)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """
+        معاملة كتابة على الاتصال الوحيد المُسلسل؛ تُثبت عند الخروج أو تُلغى عند الخطأ.
+        الاستدعاءات المتداخلة من نفس الخيط تنضم للمعاملة الخارجية.
+        """
+        with self._write_lock:
+            conn = self._writer
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
+
+    @contextmanager
+    def exclusive(self) -> Iterator[sqlite3.Connection]:
+        """
+        اتصال الكاتب خارج أي معاملة مع منع باقي الكتابات، للعمليات التي لا تُنفذ
+        داخل معاملة (ATTACH و DETACH و VACUUM)
+        """
+        with self._write_lock:
+            yield self._writer
+
+    def close(self) -> None:
+        """إغلاق كل الاتصالات (عند إنهاء التطبيق)"""
+        with self._readers_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._readers = []
+        self._local = threading.local()
+        with self._write_lock:
+            self._writer.close()
+
+
+_storages: Dict[str, SQLiteStorage] = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(db_path: str) -> SQLiteStorage:
+    """خدمة التخزين المشتركة لملف القاعدة على مستوى العملية"""
+    key = os.path.abspath(db_path)
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is None:
+            storage = SQLiteStorage(db_path)
+            _storages[key] = storage
+        return storage
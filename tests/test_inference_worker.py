@@ -0,0 +1,135 @@
+import threading
+
+from inference_worker import InferenceWorker
+
+
+class FakeAssistant:
+    """مساعد بدون نموذج يسجل كيف وصلت الطلبات إليه"""
+
+    def __init__(self):
+        self.batches = []
+        self.turns = []
+        self.seen = []  # السياق الذي رآه كل توليد
+
+    def generate_batch(self, prompts, max_length=150, temperature=0.7, deadline=None,
+                       outcomes=None, contexts=None, deadlines=None, on_chunks=None):
+        self.batches.append((list(prompts), contexts))
+        self.seen.append([list(context.turns) for context in contexts or []])
+        self.deadlines = deadlines
+        for prompt, outcome, on_chunk in zip(prompts, outcomes, on_chunks or [None] * len(prompts)):
+            outcome.update(reason="eos", tokens=1)
+            if on_chunk is not None:
+                on_chunk(f"رد: {prompt}")
+        return [f"رد: {prompt}" for prompt in prompts]
+
+    def stream_response(self, prompt, outcome=None, **kwargs):
+        self.batches.append(([prompt], None))
+        self.seen.append(list(self.turns))
+        outcome.update(reason="eos", tokens=1)
+        yield f"رد: {prompt}"
+
+    def clean_output(self, text, prompt):
+        return text
+
+    def commit_turn(self, message, response):
+        self.turns.append((message, response))
+
+
+def _send_together(worker, messages):
+    """إرسال الرسائل من خيوط متزامنة فتصل خلال نافذة الدفعة نفسها"""
+    futures = []
+    barrier = threading.Barrier(len(messages))
+
+    def send(message, assistant):
+        barrier.wait()
+        futures.append(worker.submit(message, assistant=assistant, use_context=True))
+
+    threads = [threading.Thread(target=send, args=item) for item in messages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(future.result(timeout=5) for future in futures)
+
+
+def test_concurrent_chat_messages_share_a_batch():
+    first, second = FakeAssistant(), FakeAssistant()
+    worker = InferenceWorker(first, batch_window=0.2)
+    worker.start()
+    try:
+        results = _send_together(worker, [("مرحبا", first), ("كيف حالك", second)])
+    finally:
+        worker.stop()
+        worker.join(timeout=5)
+
+    assert results == ["رد: كيف حالك", "رد: مرحبا"]
+    batches = first.batches + second.batches
+    assert len(batches) == 1
+    prompts, contexts = batches[0]
+    assert sorted(prompts) == ["كيف حالك", "مرحبا"]
+    assert contexts == [first if p == "مرحبا" else second for p in prompts]
+    # كل دور يُسجل في سياق محادثته
+    assert first.turns == [("مرحبا", "رد: مرحبا")]
+    assert second.turns == [("كيف حالك", "رد: كيف حالك")]
+    assert worker.get_metrics()["batch_size_histogram"] == {2: 1}
+
+
+def test_messages_of_one_conversation_see_each_other():
+    assistant = FakeAssistant()
+    worker = InferenceWorker(assistant, batch_window=0.2)
+    worker.start()
+    try:
+        results = _send_together(worker, [("مرحبا", assistant), ("كيف حالك", assistant)])
+    finally:
+        worker.stop()
+        worker.join(timeout=5)
+
+    assert results == ["رد: كيف حالك", "رد: مرحبا"]
+    # الرسالة الثانية تؤجل لدفعة لاحقة وتولد بعد تسجيل الدور الأول
+    assert [prompts for prompts, _ in assistant.batches] == [[p] for p, _ in assistant.turns]
+    assert assistant.seen == [[], assistant.turns[:1]]
+    assert worker.get_metrics()["batch_size_histogram"] == {1: 2}
+
+
+def test_turn_commits_keep_queue_order():
+    assistant = FakeAssistant()
+    worker = InferenceWorker(assistant, batch_window=0.2)
+    worker.start()
+    try:
+        generated = worker.submit("سؤال", assistant=assistant, use_context=True)
+        # رد مخزن لرسالة لاحقة يصل أثناء جمع الدفعة
+        committed = worker.submit_turn("شكرا", "العفو", assistant=assistant)
+        later = worker.submit("سؤال آخر", assistant=assistant, use_context=True)
+        for future in (generated, committed, later):
+            future.result(timeout=5)
+    finally:
+        worker.stop()
+        worker.join(timeout=5)
+
+    assert assistant.turns == [
+        ("سؤال", "رد: سؤال"),
+        ("شكرا", "العفو"),
+        ("سؤال آخر", "رد: سؤال آخر")
+    ]
+    assert [prompts for prompts, _ in assistant.batches] == [["سؤال"], ["سؤال آخر"]]
+
+
+def test_streamed_messages_keep_their_own_chunks_and_deadlines():
+    assistant = FakeAssistant()
+    worker = InferenceWorker(assistant, batch_window=0.2)
+    worker.start()
+    chunks = {"مرحبا": [], "كيف حالك": []}
+    try:
+        futures = [
+            worker.submit(message, on_chunk=chunks[message].append, deadline=deadline)
+            for message, deadline in (("مرحبا", None), ("كيف حالك", 10 ** 9))
+        ]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        worker.stop()
+        worker.join(timeout=5)
+
+    assert len(assistant.batches) == 1
+    assert chunks == {"مرحبا": ["رد: مرحبا"], "كيف حالك": ["رد: كيف حالك"]}
+    assert assistant.deadlines == [None, 10 ** 9]
@@ -0,0 +1,241 @@
+# ------------------------ الكتابة المؤجلة بدفعات (write-behind) ------------------------
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from migrations import migrate
+from storage import get_storage
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def _log_interaction(cursor, user_input, ai_response, is_valuable, pattern, sentiment, confidence):
+    cursor.execute("""
+    INSERT INTO interactions
+    (user_input, ai_response, is_valuable, pattern_detected, sentiment, confidence)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, (user_input, ai_response, is_valuable, pattern, sentiment, confidence))
+
+
+def _update_patterns(cursor, batch: List[Dict[str, Any]]):
+    """
+    كل تحديثات الأنماط في الدفعة: INSERT واحد لكل مثال (trigger الجدول يحذف الأقدم)
+    وعبارة تحديث واحدة للعدادات المجمعة لكل نمط
+    """
+    cursor.executemany("""
+    INSERT INTO pattern_examples (pattern_name, seq, example)
+    SELECT p.pattern_name,
+           COALESCE((SELECT MAX(seq) FROM pattern_examples e WHERE e.pattern_name = p.pattern_name), 0) + 1,
+           ?
+    FROM learning_patterns p
+    WHERE p.pattern_name = ?
+    """, [(params["example"], params["pattern_name"]) for params in batch])
+    counts = Counter(params["pattern_name"] for params in batch)
+    cursor.executemany("""
+    UPDATE learning_patterns
+    SET count = count + ?,
+        last_used = CURRENT_TIMESTAMP
+    WHERE pattern_name = ?
+    """, [(count, pattern_name) for pattern_name, count in counts.items()])
+
+
+def _update_question_usage(cursor, question):
+    cursor.execute("""
+    UPDATE common_questions
+    SET usage_count = usage_count + 1,
+        last_used = CURRENT_TIMESTAMP
+    WHERE question = ?
+    """, (question,))
+
+
+def _save_personal_info(cursor, key, value):
+    cursor.execute("INSERT OR REPLACE INTO personal_info (key, value) VALUES (?, ?)", (key, value))
+
+
+# العمليات المسموح بها (الاسم -> دالة تنفذها داخل المعاملة)
+OPERATIONS: Dict[str, Callable[..., None]] = {
+    "log_interaction": _log_interaction,
+    "update_question_usage": _update_question_usage,
+    "save_personal_info": _save_personal_info
+}
+
+# عمليات تُنفذ مجمعة لكل الدفعة (الاسم -> دالة تأخذ معاملات كل العمليات)
+BATCHED_OPERATIONS: Dict[str, Callable[..., None]] = {
+    "update_pattern": _update_patterns
+}
+
+
+class WriteBehindWriter(threading.Thread):
+    """
+    خيط كتابة واحد لكل قاعدة بيانات: العمليات تُسجل في سجل (journal) وتُعاد فوراً،
+    ثم تُنفذ في معاملة واحدة كل flush_interval أو كلما بلغت max_batch عملية.
+    السجل يُعاد تشغيله عند البدء لما بعد آخر رقم مُثبت، فلا تضيع كتابة بعد انهيار.
+    """
+
+    def __init__(self, db_path: str, journal_path: Optional[str] = None,
+                 flush_interval: float = 0.5, max_batch: int = 200):
+        super().__init__(name="WriteBehindWriter", daemon=True)
+        self.db_path = db_path
+        self.journal_path = journal_path or f"{db_path}.journal"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._pending: List[Tuple[int, str, Dict[str, Any]]] = []
+        self._condition = threading.Condition()
+        self._committed_seq = 0
+        self._running = True
+        self._flush_requested = False
+        self.stats = {"operations": 0, "transactions": 0, "failed_operations": 0}
+
+        # الدفعات تمر عبر الكاتب المُسلسل لخدمة التخزين المشتركة
+        self.storage = get_storage(db_path)
+        migrate(self.storage)  # جدول write_behind_state جزء من المخطط
+        self._committed_seq = self.storage.reader().execute(
+            "SELECT last_seq FROM write_behind_state WHERE id = 1"
+        ).fetchone()[0]
+        self._seq = self._committed_seq
+        self._recover()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # ------------------------ الاسترجاع بعد الانهيار ------------------------
+    def _recover(self) -> None:
+        """إعادة تنفيذ العمليات المسجلة في السجل ولم تُثبت في قاعدة البيانات"""
+        if not os.path.exists(self.journal_path):
+            return
+        replay = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # سطر أخير ناقص كُتب لحظة الانهيار
+                self._seq = max(self._seq, record["seq"])
+                if record["seq"] > self._committed_seq:
+                    replay.append((record["seq"], record["op"], record["params"]))
+        if replay:
+            print(f"✅ استرجاع {len(replay)} عملية من سجل الكتابة المؤجلة")
+            if not self._commit(replay):
+                return  # يبقى السجل وتُعاد المحاولة من الطابور
+        os.remove(self.journal_path)
+
+    # ------------------------ الواجهة ------------------------
+    def submit(self, op: str, **params) -> int:
+        """تسجيل عملية وإرجاع رقمها التسلسلي بدون انتظار الكتابة في قاعدة البيانات"""
+        if op not in OPERATIONS and op not in BATCHED_OPERATIONS:
+            raise ValueError(f"عملية غير معروفة: {op}")
+        with self._condition:
+            self._seq += 1
+            seq = self._seq
+            # السجل يُكتب لنظام التشغيل فوراً (بدون fsync) ليبقى بعد انهيار التطبيق
+            self._journal.write(json.dumps({"seq": seq, "op": op, "params": params}, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            self._pending.append((seq, op, params))
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+        return seq
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """حاجز: الانتظار حتى تُثبت كل العمليات المسجلة قبل الاستدعاء"""
+        with self._condition:
+            target = self._seq
+            if self._committed_seq >= target:
+                return True
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._committed_seq >= target, timeout)
+
+    @property
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """تثبيت كل ما تبقى ثم إيقاف الخيط"""
+        self.flush(timeout)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+    # ------------------------ خيط الكتابة ------------------------
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (not self._running or self._flush_requested
+                             or len(self._pending) >= self.max_batch),
+                    self.flush_interval
+                )
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                running = self._running
+            if batch:
+                self._commit(batch)
+            if not running:
+                break
+
+    def _run_operation(self, cursor, op: str, count: int, function: Callable[..., None],
+                       *args, **kwargs) -> None:
+        """تنفيذ عملية (أو مجموعة عمليات مجمعة) داخل نقطة حفظ خاصة بها"""
+        cursor.execute("SAVEPOINT op")
+        try:
+            function(cursor, *args, **kwargs)
+            cursor.execute("RELEASE op")
+        except (sqlite3.Error, json.JSONDecodeError, TypeError, KeyError) as e:
+            # عملية فاسدة لا تُسقط باقي الدفعة
+            cursor.execute("ROLLBACK TO op")
+            cursor.execute("RELEASE op")
+            self.stats["failed_operations"] += count
+            print(f"Error in write-behind {op}: {str(e)}")
+
+    def _commit(self, batch: List[Tuple[int, str, Dict[str, Any]]]) -> bool:
+        """تنفيذ الدفعة في معاملة واحدة (fsync واحد للدفعة كلها)"""
+        try:
+            with self.storage.write() as conn:
+                cursor = conn.cursor()
+                grouped: Dict[str, List[Dict[str, Any]]] = {}
+                for seq, op, params in batch:
+                    if op in BATCHED_OPERATIONS:
+                        grouped.setdefault(op, []).append(params)
+                    else:
+                        self._run_operation(cursor, op, 1, OPERATIONS[op], **params)
+                for op, op_params in grouped.items():
+                    self._run_operation(cursor, op, len(op_params), BATCHED_OPERATIONS[op], op_params)
+                last_seq = batch[-1][0]
+                cursor.execute("UPDATE write_behind_state SET last_seq = ? WHERE id = 1", (last_seq,))
+        except sqlite3.Error as e:
+            print(f"Error committing write-behind batch: {str(e)}")
+            # تُعاد المحاولة في الدورة التالية؛ السجل ما زال يحتفظ بها
+            with self._condition:
+                self._pending = batch + self._pending
+            time.sleep(self.flush_interval)
+            return False
+
+        with self._condition:
+            self._committed_seq = last_seq
+            self.stats["operations"] += len(batch)
+            self.stats["transactions"] += 1
+            # كل ما في السجل أصبح مثبتاً: نبدأ سجلاً فارغاً حتى لا يكبر بلا حد
+            if not self._pending and self._seq == last_seq and hasattr(self, "_journal"):
+                self._journal.truncate(0)
+                self._journal.seek(0)
+            self._condition.notify_all()
+        return True
+
+
+_writers: Dict[str, WriteBehindWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_write_behind(db_path: str) -> WriteBehindWriter:
+    """كاتب واحد مشترك لكل ملف قاعدة بيانات على مستوى العملية"""
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or not writer.is_alive():
+            writer = WriteBehindWriter(db_path)
+            writer.start()
+            _writers[key] = writer
+        return writer